@@ -3,6 +3,9 @@ from labkit.models.labbook import Labbook
 from labkit.models.network import Image, ImageType, Node, Interface, InterfaceMode, Link, VolumeMount
 from labkit.models.events import LinkPropertiesMode
 
+# 预先生成的接口名，避免在循环中反复格式化
+_ETH_NAMES = tuple(f"eth{i}" for i in range(16))
+
 def main():
     labbook_dir = "book2"
     builder = Builder(output_dir=labbook_dir)
@@ -13,47 +16,43 @@ def main():
     builder.add_image(image)
 
     grid_size = 3
+    node_names = [f"node{i}" for i in range(grid_size * grid_size)]
     nodes = []
-    node_interfaces = [{} for _ in range(grid_size * grid_size)]  # 记录每个节点每个接口的IP
+    node_interfaces = {}  # (节点索引, 接口索引) -> 本端IP
     links = []  # (link_id, n1, eth1_idx, n2, eth2_idx, subnet, ip1, ip2)
+    peer_ip_by_endpoint = {}  # (节点索引, 接口索引) -> 对端IP
     subnet_base = 10  # 10.0.x.0/24
-    link_id = 0
 
-    # 先分配链路和IP
-    for row in range(grid_size):
-        for col in range(grid_size):
-            idx = row * grid_size + col
-            # 右邻居
-            if col < grid_size - 1:
-                n1, n2 = idx, idx + 1
-                subnet = f"10.0.{subnet_base}.0/24"
-                ip1 = f"10.0.{subnet_base}.1/24"
-                ip2 = f"10.0.{subnet_base}.2/24"
-                node_interfaces[n1][1] = ip1  # eth1
-                node_interfaces[n2][3] = ip2  # eth3
-                links.append((f"link{link_id}", n1, 1, n2, 3, subnet, ip1, ip2))
-                subnet_base += 1
-                link_id += 1
-            # 下邻居
-            if row < grid_size - 1:
-                n1, n2 = idx, idx + grid_size
-                subnet = f"10.0.{subnet_base}.0/24"
-                ip1 = f"10.0.{subnet_base}.1/24"
-                ip2 = f"10.0.{subnet_base}.2/24"
-                node_interfaces[n1][2] = ip1  # eth2
-                node_interfaces[n2][0] = ip2  # eth0
-                links.append((f"link{link_id}", n1, 2, n2, 0, subnet, ip1, ip2))
-                subnet_base += 1
-                link_id += 1
+    # 先按节点顺序收集所有相邻节点对 (n1, eth1_idx, n2, eth2_idx)
+    edges = []
+    for idx in range(grid_size * grid_size):
+        row, col = divmod(idx, grid_size)
+        if col < grid_size - 1:
+            edges.append((idx, 1, idx + 1, 3))  # 右邻居: eth1 -> eth3
+        if row < grid_size - 1:
+            edges.append((idx, 2, idx + grid_size, 0))  # 下邻居: eth2 -> eth0
+
+    # 再一次性分配链路ID和IP，第k条链路使用 10.0.(subnet_base+k).0/24
+    for link_id, (n1, eth1_idx, n2, eth2_idx) in enumerate(edges):
+        prefix = f"10.0.{subnet_base + link_id}."
+        subnet = prefix + "0/24"
+        ip1 = prefix + "1/24"
+        ip2 = prefix + "2/24"
+        node_interfaces[(n1, eth1_idx)] = ip1
+        node_interfaces[(n2, eth2_idx)] = ip2
+        peer_ip_by_endpoint[(n1, eth1_idx)] = ip2
+        peer_ip_by_endpoint[(n2, eth2_idx)] = ip1
+        links.append((f"link{link_id}", n1, eth1_idx, n2, eth2_idx, subnet, ip1, ip2))
 
     # 创建节点
     for i in range(grid_size * grid_size):
-        node_name = f"node{i}"
+        node_name = node_names[i]
         interfaces = []
         for j in range(4):
-            ip_list = [node_interfaces[i][j]] if j in node_interfaces[i] else None
+            my_ip = node_interfaces.get((i, j))
+            ip_list = [my_ip] if my_ip is not None else None
             interfaces.append(
-                Interface.template(name=f"eth{j}", mode=InterfaceMode.DIRECT, ip_list=ip_list)
+                Interface.template(name=_ETH_NAMES[j], mode=InterfaceMode.DIRECT, ip_list=ip_list)
             )
         node = Node.template(name=node_name, image="ponedo/frr-ubuntu20:tiny", interfaces=interfaces)
         builder.add_node(node)
@@ -61,33 +60,28 @@ def main():
 
     # 创建链路
     for (lid, n1, eth1_idx, n2, eth2_idx, subnet, ip1, ip2) in links:
-        builder.add_link(Link.template(id=lid, endpoints=[f"node{n1}:eth{eth1_idx}", f"node{n2}:eth{eth2_idx}"]))
+        builder.add_link(Link.template(id=lid, endpoints=[f"{node_names[n1]}:{_ETH_NAMES[eth1_idx]}", f"{node_names[n2]}:{_ETH_NAMES[eth2_idx]}"]))
 
     # 聚合所有链路属性设置事件
+    # 所有链路属性相同，共用同一个 LinkProperties 实例（之后不再修改）
+    link_properties = builder.new_link_properties(mode=LinkPropertiesMode.UP, delay="10ms")
     events = []
     for (lid, n1, eth1_idx, n2, eth2_idx, subnet, ip1, ip2) in links:
-        link_properties = builder.new_link_properties(mode=LinkPropertiesMode.UP, delay="10ms")
         link_attr_set_event = builder.new_network_link_attr_set_event(id=lid, link_properties=link_properties)
         events.append(link_attr_set_event)
-    link_attr_set_action = builder.build_network_events_action(events, "all_links_attr_set")
+    link_attr_set_action = builder.create_network_events_action(events, "all_links_attr_set")
     builder.add_timeline_item(at=1000, description="set all links delay 10ms", action=link_attr_set_action)
 
-    # 每个ping output事件单独action和timeline，ping命令目标IP不带mask
-    ping_event_idx = 0
+    # 所有ping事件聚合为一个action和timeline，ping命令目标IP不带mask
+    # netfunc-exec-output 不可聚合，因此批量ping使用 netfunc-events，输出仍由各自的 output 指定
+    ping_events = []
     for i in range(grid_size * grid_size):
-        node_name = f"node{i}"
+        node_name = node_names[i]
         for j in range(4):
-            my_ip = node_interfaces[i].get(j)
+            my_ip = node_interfaces.get((i, j))
             if my_ip is None:
                 continue
-            peer_ip = None
-            for (lid, n1, eth1_idx, n2, eth2_idx, subnet, ip1, ip2) in links:
-                if n1 == i and eth1_idx == j:
-                    peer_ip = ip2
-                    break
-                if n2 == i and eth2_idx == j:
-                    peer_ip = ip1
-                    break
+            peer_ip = peer_ip_by_endpoint.get((i, j))
             if peer_ip:
                 peer_ip_noprefix = peer_ip.split('/')[0]
                 exec_args = builder.new_node_exec_args(
@@ -95,14 +89,9 @@ def main():
                     output=f"/tmp/{node_name}_eth{j}_ping.log",
                     timeout=30
                 )
-                netfunc_event = builder.new_netfunc_exec_output_event(node_name=node_name, exec_args=exec_args)
-                netfunc_action = builder.build_netfunc_exec_output_event_action(netfunc_event, f"{node_name}_eth{j}_ping")
-                builder.add_timeline_item(
-                    at=2000 + ping_event_idx,
-                    description=f"{node_name} eth{j} ping neighbor {peer_ip_noprefix}",
-                    action=netfunc_action
-                )
-                ping_event_idx += 1
+                ping_events.append(builder.new_netfunc_event(node_name=node_name, exec_args=exec_args))
+    all_pings_action = builder.create_netfunc_events_action(ping_events, "all_pings")
+    builder.add_timeline_item(at=2000, description="all nodes ping neighbors", action=all_pings_action)
 
     builder.build()
 
@@ -60,14 +60,14 @@ builder.add_link(link1)
 # 配置链路属性（如带宽、延迟、丢包率等），并添加到时间线事件
 link_properties = builder.new_link_properties(mode=LinkPropertiesMode.UP, bandwidth="100Mbps", loss="0.00%", delay="10ms")
 link_attr_set_event = builder.new_network_link_attr_set_event(id="link1", link_properties=link_properties)
-link_attr_set_action = builder.build_network_events_action([link_attr_set_event], "link_attr_set_event")
+link_attr_set_action = builder.create_network_events_action([link_attr_set_event], "link_attr_set_event")
 builder.add_timeline_item(at=1000, description="set link1 link properties up 100Mbps delay 10ms loss 0.00%", action=link_attr_set_action)
 
 # %%
 # 配置节点执行 ping 命令的事件，并添加到时间线
 exec_args = builder.new_node_exec_args(shellcodes=["ping -c 10 -i 0.1 192.168.1.101"], output="/tmp/output.log", timeout=30)
 netfunc_event = builder.new_netfunc_exec_output_event(node_name="node1", exec_args=exec_args)
-netfunc_action = builder.build_netfunc_exec_output_event_action(netfunc_event, "netfunc_exec_output_event")
+netfunc_action = builder.create_netfunc_exec_output_event_action(netfunc_event, "netfunc_exec_output_event")
 builder.add_timeline_item(at=2000, description="ping node1 10 times", action=netfunc_action)
 
 # %%
@@ -13,12 +13,21 @@ import os
 import sys
 import time
 import json
+import shutil
 import logging
+import logging.handlers
 import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 添加 workspace 目录到 Python 路径
 workspace_path = os.path.join(os.path.dirname(__file__), '..', '..')
 sys.path.insert(0, workspace_path)
@@ -47,44 +56,120 @@ def setup_logging(log_dir: str = "logs", log_level: str = "INFO"):
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     date_format = '%Y-%m-%d %H:%M:%S'
     
+    level = getattr(logging, log_level.upper())
+    
+    # 文件日志经 MemoryHandler 缓冲后批量写入，ERROR 及以上立即刷新；
+    # 缓冲较小，且监控循环每轮及管理器停止时调用 flush_logging() 刷新，日志文件不会长时间滞后
+    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(log_format, date_format))
+    buffered_file_handler = logging.handlers.MemoryHandler(capacity=64, target=file_handler)
+    
     logging.basicConfig(
-        level=getattr(logging, log_level.upper()),
+        level=level,
         format=log_format,
         datefmt=date_format,
         handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
+            buffered_file_handler,
             logging.StreamHandler(sys.stdout)
         ]
     )
     
+    # 根日志器已配置好处理器，命名日志器直接继承，避免每条日志重复写入
     logger = logging.getLogger('SATuSGH.LabGrid')
-    logger.setLevel(getattr(logging, log_level.upper()))
-    
-    if not logger.handlers:
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        console_handler = logging.StreamHandler(sys.stdout)
-        
-        formatter = logging.Formatter(log_format, date_format)
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+    logger.setLevel(level)
     
     return logger, log_file
 
 
+def flush_logging():
+    """刷新根日志器上的所有处理器（包括缓冲的文件日志）"""
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+
 # ==================== 常量定义 ====================
 
 # 实验相关常量
 DELTA_MAX = 5000  # 最大时间偏移量（毫秒）
 LABX_PATH = "/home/cnic/reals/bin/kinexlabx"  # 实验执行器路径
 SERVER_PORT = 8080  # 服务器端口
+TEMP_DIR_NAMES = frozenset({'temp', 'tmp', '.tmp'})  # 实验结束后清理的本地临时目录
 
 # 实验类型标识
 EXPERIMENT_TYPE = "satusgh_experiment"
 
 
+# ==================== 实验环境生成 ====================
+
+def build_environment(output_dir: str, delta_t1: int, delta_t2: int) -> str:
+    """
+    生成单个实验的 labbook 目录（可在子进程中执行）
+    
+    Args:
+        output_dir: 输出目录
+        delta_t1: 链路删除时间偏移量（毫秒）
+        delta_t2: 链路创建时间偏移量（毫秒）
+        
+    Returns:
+        输出目录
+    """
+    labgen = SATuSGHLabGen(
+        output_dir=output_dir,
+        link_delete_offset=delta_t1,
+        link_create_offset=delta_t2
+    )
+    labgen.init_network()
+    labgen.add_core_network_actions()
+    labgen.build()
+    return output_dir
+
+
+# ==================== 实验摘要汇总 ====================
+
+class ExperimentSummaryLog:
+    """
+    实验摘要汇总文件
+    
+    整个运行期间只打开一次，每个实验的摘要作为一行 JSON 追加写入（JSON Lines），
+    多个工作线程共享同一个文件句柄；每条写入后立即 flush，进程异常退出也不丢失已完成实验的摘要。
+    """
+    
+    def __init__(self, path: str):
+        """
+        打开汇总文件
+        
+        Args:
+            path: 汇总文件路径（.jsonl）
+        """
+        self.path = path
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._file = open(path, 'ab')
+        self._lock = threading.Lock()
+    
+    def append(self, summary: Dict[str, Any]):
+        """
+        追加一条实验摘要
+        
+        Args:
+            summary: 实验摘要
+        """
+        if orjson is not None:
+            line = orjson.dumps(summary, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        else:
+            line = (json.dumps(summary, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+    
+    def close(self):
+        """刷新并关闭汇总文件"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
 # ==================== SATuSGH 实验类 ====================
 
 class SATuSGHExperiment(Lab):
@@ -94,8 +179,16 @@ class SATuSGHExperiment(Lab):
     继承自 LabGrid 的 Lab 基类，实现完整的实验生命周期管理
     """
     
-    def __init__(self, config: ExperimentConfig, labx):
+    def __init__(self, config: ExperimentConfig, labx,
+                 summary_log: Optional[ExperimentSummaryLog] = None):
+        """
+        Args:
+            config: 实验配置
+            labx: LabX 实例
+            summary_log: 共享的摘要汇总文件；为 None 时在实验输出目录写 experiment_summary.json
+        """
         super().__init__(config, labx)
+        self.summary_log = summary_log
         self.logger = logging.getLogger('SATuSGH.Experiment')
         self.log("🔬 初始化 SATuSGH 实验")
         
@@ -104,9 +197,15 @@ class SATuSGHExperiment(Lab):
         self.delta_t2 = config.parameters.get('delta_t2', 0)
         self.output_dir = config.output_dir
         
+        # 实验过程中反复使用的路径，只计算一次
+        self._config_yaml = os.path.join(self.output_dir, 'network', 'config.yaml')
+        self._summary_file = os.path.join(self.output_dir, 'experiment_summary.json')
+        self._remote_dir = f"/tmp/{os.path.basename(self.output_dir)}"
+        
         # 实验状态
         self.labbook_output_dir = None
         self.remote_labbook_dir = None
+        self._local_files_cleaned = False
         
     def initialize(self) -> bool:
         """初始化实验环境"""
@@ -120,18 +219,11 @@ class SATuSGHExperiment(Lab):
             # 生成实验环境
             self.labbook_output_dir = self.output_dir
             
-            # 检查目录是否存在且包含必要的文件
-            if not os.path.exists(self.labbook_output_dir) or not os.path.exists(os.path.join(self.labbook_output_dir, 'network', 'config.yaml')):
+            # 检查目录是否包含必要的文件（文件存在即说明目录存在，只需一次 stat）
+            if not os.path.exists(self._config_yaml):
                 self.log(f"🔧 生成实验环境: delta_t1={self.delta_t1}, delta_t2={self.delta_t2}")
                 
-                labgen = SATuSGHLabGen(
-                    output_dir=self.labbook_output_dir,
-                    link_delete_offset=self.delta_t1,
-                    link_create_offset=self.delta_t2
-                )
-                labgen.init_network()
-                labgen.add_core_network_actions()
-                labgen.build()
+                build_environment(self.labbook_output_dir, self.delta_t1, self.delta_t2)
                 
                 self.log("✅ 实验环境生成成功")
             else:
@@ -156,43 +248,27 @@ class SATuSGHExperiment(Lab):
             self.log(f"🚀 在服务器 {server_name} 上执行实验")
             
             # 1. 上传实验文件
-            self.remote_labbook_dir = f"/tmp/{os.path.basename(self.labbook_output_dir)}"
+            self.remote_labbook_dir = self._remote_dir
             
-            if not self.labx.upload_directory(server_name, self.labbook_output_dir, self.remote_labbook_dir):
+            if not self.labx.upload_directory_tar(server_name, self.labbook_output_dir, self.remote_labbook_dir):
                 self.log("❌ 实验文件上传失败", "ERROR")
                 return False
             
             self.log("✅ 实验文件上传成功")
             
-            # 2. 验证远程文件和环境
-            self.log("🔍 验证远程实验环境...")
-            
-            # 检查远程目录是否存在
-            check_dir_cmd = f"ls -la {self.remote_labbook_dir}"
-            dir_result = self.labx.execute_command(server_name, check_dir_cmd, timeout=30)
-            if not dir_result or not dir_result.get('success'):
-                self.log(f"❌ 远程目录检查失败: {dir_result.get('stderr', '未知错误') if dir_result else '执行失败'}", "ERROR")
-                return False
-            
-            self.log(f"📁 远程目录内容: {dir_result.get('stdout', '')}")
-            
-            # 检查 kinexlabx 是否存在且有执行权限
-            check_labx_cmd = f"ls -la {LABX_PATH}"
-            labx_result = self.labx.execute_command(server_name, check_labx_cmd, timeout=30)
-            if not labx_result or not labx_result.get('success'):
-                self.log(f"❌ kinexlabx 文件检查失败: {labx_result.get('stderr', '未知错误') if labx_result else '执行失败'}", "ERROR")
-                return False
-            
-            self.log(f"🔧 kinexlabx 文件信息: {labx_result.get('stdout', '')}")
-            
-            # 3. 执行实验命令
+            # 2. 执行实验命令
             server_ip = self._get_server_ip(server_name)
             if not server_ip:
                 self.log("❌ 无法获取服务器IP", "ERROR")
                 return False
             
-            command = f"{LABX_PATH} -ip {server_ip} -port {SERVER_PORT} -book {self.remote_labbook_dir}"
-            self.log(f"🔧 执行命令: {command}")
+            # 远程目录已由 tar 上传保证存在；kinexlabx 的可执行检查并入同一次 SSH 执行
+            run_command = f"{LABX_PATH} -ip {server_ip} -port {SERVER_PORT} -book {self.remote_labbook_dir}"
+            command = (
+                f"test -x {LABX_PATH} || {{ echo 'kinexlabx 不存在或没有执行权限: {LABX_PATH}' >&2; exit 127; }}; "
+                f"{run_command}"
+            )
+            self.log(f"🔧 执行命令: {run_command}")
             
             # 增加命令执行的详细日志
             self.log(f"📍 在服务器 {server_name} ({server_ip}) 上执行")
@@ -211,7 +287,7 @@ class SATuSGHExperiment(Lab):
             self.log("✅ 实验执行成功")
             
             # 3. 下载实验结果
-            if not self.labx.sync_directory(server_name, self.remote_labbook_dir, self.labbook_output_dir):
+            if not self.labx.download_directory_tar(server_name, self.remote_labbook_dir, self.labbook_output_dir):
                 self.log("❌ 结果下载失败", "ERROR")
                 return False
             
@@ -262,8 +338,6 @@ class SATuSGHExperiment(Lab):
         self.log("💾 阶段5: 保存实验结果")
         
         try:
-            # 创建结果摘要文件
-            summary_file = os.path.join(self.output_dir, "experiment_summary.json")
             summary = {
                 'experiment_id': self.result.experiment_id,
                 'delta_t1': self.delta_t1,
@@ -276,8 +350,15 @@ class SATuSGHExperiment(Lab):
                 'metrics': self.result.metrics
             }
             
-            with open(summary_file, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2, ensure_ascii=False)
+            if self.summary_log is not None:
+                self.summary_log.append(summary)
+            elif orjson is not None:
+                Path(self._summary_file).write_bytes(
+                    orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+                )
+            else:
+                with open(self._summary_file, 'w', encoding='utf-8') as f:
+                    json.dump(summary, f, indent=2, ensure_ascii=False)
             
             self.log("✅ 实验结果保存成功")
             return True
@@ -305,29 +386,32 @@ class SATuSGHExperiment(Lab):
     def _get_server_ip(self, server_name: str) -> Optional[str]:
         """获取服务器IP地址"""
         try:
-            # 直接从配置中获取服务器IP
-            for name, config in self.labx.servers_config.items():
-                if name == server_name:
-                    return config.host
-            
-            return None
+            # 直接从配置中按名称获取服务器IP
+            config = self.labx.servers_config.get(server_name)
+            return config.host if config else None
             
         except Exception as e:
             self.log(f"❌ 获取服务器IP失败: {e}", "ERROR")
             return None
     
     def _cleanup_local_files(self):
-        """清理本地临时文件"""
+        """清理本地临时文件（collect_data 与 cleanup 都会调用，只执行一次）"""
+        if self._local_files_cleaned or not self.labbook_output_dir:
+            return
+        
         try:
-            if os.path.exists(self.labbook_output_dir):
-                # 保留结果文件，只清理临时文件
-                temp_files = ['temp', 'tmp', '.tmp']
-                for temp_dir in temp_files:
-                    temp_path = os.path.join(self.labbook_output_dir, temp_dir)
-                    if os.path.exists(temp_path):
-                        import shutil
-                        shutil.rmtree(temp_path)
-                        self.log(f"✅ 清理临时目录: {temp_dir}")
+            # 一次 scandir 列出子目录，保留结果文件，只清理临时目录
+            try:
+                with os.scandir(self.labbook_output_dir) as it:
+                    dir_names = {entry.name for entry in it if entry.is_dir()}
+            except FileNotFoundError:
+                dir_names = set()
+            
+            for temp_dir in sorted(dir_names & TEMP_DIR_NAMES):
+                shutil.rmtree(os.path.join(self.labbook_output_dir, temp_dir), ignore_errors=True)
+                self.log(f"✅ 清理临时目录: {temp_dir}")
+            
+            self._local_files_cleaned = True
         except Exception as e:
             self.log(f"⚠️  清理临时文件时出错: {e}", "WARNING")
 
@@ -343,7 +427,8 @@ class SATuSGHLabGridManager:
     
     def __init__(self, servers_config_file: str = "configs/servers.json", 
                  framework_config_file: str = None,
-                 config_dir: str = "configs"):
+                 config_dir: str = "configs",
+                 summary_file: Optional[str] = "results/experiments_summary.jsonl"):
         """
         初始化管理器
         
@@ -351,6 +436,8 @@ class SATuSGHLabGridManager:
             servers_config_file: 服务器配置文件
             framework_config_file: 框架配置文件
             config_dir: 配置目录
+            summary_file: 所有实验共享的摘要汇总文件（JSON Lines），为 None 时
+                每个实验在自己的输出目录写 experiment_summary.json
         """
         self.logger = logging.getLogger('SATuSGH.LabGridManager')
         self.logger.info("🚀 初始化 SATuSGH LabGrid 管理器")
@@ -363,9 +450,20 @@ class SATuSGHLabGridManager:
             auto_start=True
         )
         
+        # 实验摘要汇总文件，整个运行期间只打开一次
+        self.summary_log = ExperimentSummaryLog(summary_file) if summary_file else None
+        
         # 注册实验类型
         self._register_experiment_type()
         
+        # 任务结束事件，由任务回调触发，用于唤醒监控循环
+        self.task_done_event = threading.Event()
+        
+        # 服务器积压缓存（运行中 + 排队中任务数），用于提交时的调度提示
+        self._backlog: Dict[str, int] = {}
+        self._backlog_time = 0.0
+        self._backlog_ttl = 1.0
+        
         # 实验统计
         self.total_experiments = 0
         self.completed_experiments = 0
@@ -374,17 +472,100 @@ class SATuSGHLabGridManager:
         self.logger.info("✅ SATuSGH LabGrid 管理器初始化完成")
     
     def _register_experiment_type(self):
-        """注册实验类型"""
+        """注册实验类型（LabGrid 以 (config, labx) 构造实验，由子类把本管理器的摘要汇总文件传入）"""
+        summary_log = self.summary_log
+        
+        class ManagedSATuSGHExperiment(SATuSGHExperiment):
+            def __init__(self, config: ExperimentConfig, labx):
+                super().__init__(config, labx, summary_log=summary_log)
+        
         self.labgrid.register_experiment(
             experiment_type=EXPERIMENT_TYPE,
-            experiment_class=SATuSGHExperiment,
+            experiment_class=ManagedSATuSGHExperiment,
             description="SATuSGH 卫星网络拓扑实验",
             tags=["satellite", "network", "topology", "satusgh"]
         )
         self.logger.info(f"✅ 注册实验类型: {EXPERIMENT_TYPE}")
     
+    def prebuild_environments(self, experiments: List[Dict[str, Any]],
+                              max_workers: Optional[int] = None) -> Dict[str, bool]:
+        """
+        提交前在本地多进程并行生成所有实验环境
+        
+        已生成的目录会被跳过；生成失败的实验仍会在 initialize() 中重新生成。
+        
+        Args:
+            experiments: 实验配置列表，每个元素包含 output_dir, delta_t1, delta_t2
+            max_workers: 最大进程数，默认为 CPU 核数
+            
+        Returns:
+            输出目录 -> 是否生成成功
+        """
+        results = {}
+        pending = []
+        for exp in experiments:
+            output_dir = exp['output_dir']
+            if os.path.exists(os.path.join(output_dir, 'network', 'config.yaml')):
+                results[output_dir] = True
+            else:
+                pending.append(exp)
+        
+        if not pending:
+            return results
+        
+        self.logger.info(f"🔧 并行生成 {len(pending)} 个实验环境...")
+        # 此时 LabGrid 工作线程已启动，使用 spawn 启动子进程，避免 fork 多线程进程导致子进程死锁
+        mp_context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+            futures = {
+                executor.submit(build_environment, exp['output_dir'], exp['delta_t1'], exp['delta_t2']): exp['output_dir']
+                for exp in pending
+            }
+            for future in as_completed(futures):
+                output_dir = futures[future]
+                try:
+                    future.result()
+                    results[output_dir] = True
+                except Exception as e:
+                    self.logger.error(f"❌ 生成实验环境 {output_dir} 失败: {e}")
+                    results[output_dir] = False
+        
+        self.logger.info(f"✅ 实验环境生成完成: {sum(results.values())}/{len(results)}")
+        return results
+    
+    def _select_preferred_server(self) -> Optional[str]:
+        """
+        按最短积压选择服务器（积压 = 运行中任务 + 已提示到该服务器的排队任务）
+        
+        积压统计缓存 _backlog_ttl 秒，缓存期内每次选择后本地累加，
+        避免批量提交时反复查询任务列表且全部落到同一台服务器。
+        
+        Returns:
+            积压最少的服务器名称，没有服务器时返回 None
+        """
+        now = time.monotonic()
+        if now - self._backlog_time > self._backlog_ttl:
+            backlog = {name: 0 for name in self.labgrid.get_all_server_info()}
+            all_tasks = self.labgrid.get_all_tasks()
+            for task in all_tasks['running']:
+                if task.assigned_server in backlog:
+                    backlog[task.assigned_server] += 1
+            for task in all_tasks['pending']:
+                if task.config.preferred_server in backlog:
+                    backlog[task.config.preferred_server] += 1
+            self._backlog = backlog
+            self._backlog_time = now
+        
+        if not self._backlog:
+            return None
+        
+        server_name = min(self._backlog, key=self._backlog.get)
+        self._backlog[server_name] += 1
+        return server_name
+    
     def submit_experiment(self, output_dir: str, delta_t1: int, delta_t2: int, 
-                         timeout: int = 3600, priority: int = 0) -> str:
+                         timeout: int = 3600, priority: int = 0,
+                         preferred_server: Optional[str] = None) -> str:
         """
         提交实验任务
         
@@ -394,26 +575,16 @@ class SATuSGHLabGridManager:
             delta_t2: 链路创建时间偏移量（毫秒）
             timeout: 超时时间（秒）
             priority: 优先级
+            preferred_server: 优先分配的服务器，默认按最短积压选择
             
         Returns:
             任务ID
         """
         try:
-            # 创建实验配置
-            config = create_experiment_config(
-                experiment_type=EXPERIMENT_TYPE,
-                output_dir=output_dir,
-                parameters={
-                    'delta_t1': delta_t1,
-                    'delta_t2': delta_t2
-                },
-                timeout=timeout,
-                priority=priority,
-                description=f"SATuSGH实验: delta_t1={delta_t1}, delta_t2={delta_t2}"
-            )
+            config = self._create_config(output_dir, delta_t1, delta_t2, timeout, priority, preferred_server)
             
             # 运行实验
-            task_id = self.labgrid.run_experiment(EXPERIMENT_TYPE, config)
+            task_id = self.labgrid.run_experiment(EXPERIMENT_TYPE, config, callback=self._on_task_done)
             
             self.total_experiments += 1
             self.logger.info(f"📋 提交实验任务 {task_id}: delta_t1={delta_t1}, delta_t2={delta_t2}")
@@ -424,7 +595,44 @@ class SATuSGHLabGridManager:
             self.logger.error(f"❌ 提交实验任务失败: {e}")
             raise
     
-    def submit_batch_experiments(self, experiments: List[Dict[str, Any]]) -> List[str]:
+    def _create_config(self, output_dir: str, delta_t1: int, delta_t2: int,
+                       timeout: int = 3600, priority: int = 0,
+                       preferred_server: Optional[str] = None) -> ExperimentConfig:
+        """
+        创建实验配置，未指定服务器时按最短积压选择
+        
+        Args:
+            output_dir: 输出目录
+            delta_t1: 链路删除时间偏移量（毫秒）
+            delta_t2: 链路创建时间偏移量（毫秒）
+            timeout: 超时时间（秒）
+            priority: 优先级
+            preferred_server: 优先分配的服务器
+            
+        Returns:
+            实验配置
+        """
+        if preferred_server is None:
+            preferred_server = self._select_preferred_server()
+        
+        return create_experiment_config(
+            experiment_type=EXPERIMENT_TYPE,
+            output_dir=output_dir,
+            parameters={
+                'delta_t1': delta_t1,
+                'delta_t2': delta_t2
+            },
+            timeout=timeout,
+            priority=priority,
+            preferred_server=preferred_server,
+            description=f"SATuSGH实验: delta_t1={delta_t1}, delta_t2={delta_t2}"
+        )
+    
+    def _on_task_done(self, task):
+        """任务结束回调（在 LabGrid 工作线程中执行）"""
+        self.task_done_event.set()
+    
+    def submit_batch_experiments(self, experiments: List[Dict[str, Any]]) -> List[Optional[str]]:
         """
         批量提交实验任务
         
@@ -432,26 +640,38 @@ class SATuSGHLabGridManager:
             experiments: 实验配置列表，每个元素包含 output_dir, delta_t1, delta_t2
             
         Returns:
-            任务ID列表
+            与 experiments 一一对应的任务ID列表，提交失败的实验对应 None
         """
-        task_ids = []
-        
-        for exp in experiments:
+        # 先构建全部配置，再通过 LabGrid 批量接口一次性提交
+        batch = []
+        batch_index = {}  # id(config) -> 在 experiments 中的下标
+        for i, exp in enumerate(experiments):
             try:
-                task_id = self.submit_experiment(
+                config = self._create_config(
                     output_dir=exp['output_dir'],
                     delta_t1=exp['delta_t1'],
                     delta_t2=exp['delta_t2'],
                     timeout=exp.get('timeout', 3600),
-                    priority=exp.get('priority', 0)
+                    priority=exp.get('priority', 0),
+                    preferred_server=exp.get('preferred_server')
                 )
-                task_ids.append(task_id)
+                batch.append((EXPERIMENT_TYPE, config))
+                batch_index[id(config)] = i
                 
             except Exception as e:
                 self.logger.error(f"❌ 提交实验 {exp} 失败: {e}")
         
+        task_ids = self.labgrid.run_batch_experiments(batch, callback=self._on_task_done)
+        self.total_experiments += len(task_ids)
+        
+        # 批量接口会跳过提交失败的实验，按任务的配置对象映射回原下标
+        results: List[Optional[str]] = [None] * len(experiments)
+        for task_id in task_ids:
+            task = self.labgrid.task_manager.get_task(task_id)
+            results[batch_index[id(task.config)]] = task_id
+        
         self.logger.info(f"📋 批量提交了 {len(task_ids)} 个实验任务")
-        return task_ids
+        return results
     
     def wait_for_experiment(self, task_id: str, timeout: int = None) -> bool:
         """
@@ -517,6 +737,10 @@ class SATuSGHLabGridManager:
             self.logger.info("✅ 管理器已停止")
         except Exception as e:
             self.logger.error(f"❌ 停止管理器时出错: {e}")
+        finally:
+            if self.summary_log is not None:
+                self.summary_log.close()
+            flush_logging()
 
 
 # ==================== 主函数和示例 ====================
@@ -527,6 +751,7 @@ def main():
     logger, log_file = setup_logging()
     logger.info("🚀 启动 SATuSGH LabGrid 示例")
     
+    manager = None
     try:
         # 创建管理器
         manager = SATuSGHLabGridManager(
@@ -588,26 +813,26 @@ def main():
                 "priority": 4
             })
         
+        # 提交前在本地并行生成所有实验环境
+        manager.prebuild_environments(experiments)
+        
         # 批量提交实验
         submitted_tasks = []
-        for i, exp_config in enumerate(experiments):
-            try:
-                task_id = manager.submit_experiment(**exp_config)
-                submitted_tasks.append({
-                    "task_id": task_id,
-                    "config": exp_config,
-                    "index": i + 1
-                })
-                logger.info(f"✅ 实验 {i+1}/20 已提交: {task_id} - {exp_config['output_dir']}")
-                
-                # 避免同时提交过多任务，给系统一些缓冲时间
-                if (i + 1) % 5 == 0:
-                    logger.info(f"⏸️  已提交 {i+1} 个实验，暂停2秒...")
-                    import time
-                    time.sleep(2)
-                    
-            except Exception as e:
-                logger.error(f"❌ 实验 {i+1}/20 提交失败: {e}")
+        try:
+            task_ids = manager.submit_batch_experiments(experiments)
+        except Exception as e:
+            logger.error(f"❌ 批量提交失败: {e}")
+            task_ids = [None] * len(experiments)
+        for i, (exp_config, task_id) in enumerate(zip(experiments, task_ids)):
+            if task_id is None:
+                logger.error(f"❌ 实验 {i+1}/20 提交失败: {exp_config['output_dir']}")
+                continue
+            submitted_tasks.append({
+                "task_id": task_id,
+                "config": exp_config,
+                "index": i + 1
+            })
+            logger.info(f"✅ 实验 {i+1}/20 已提交: {task_id} - {exp_config['output_dir']}")
         
         logger.info(f"🎯 总共提交了 {len(submitted_tasks)} 个实验任务")
         
@@ -616,16 +841,23 @@ def main():
         
         completed_tasks = []
         failed_tasks = []
+        task_info_by_id = {task_info["task_id"]: task_info for task_info in submitted_tasks}
+        finished_task_ids = set()
         
         # 定期检查任务状态
-        import time
-        check_interval = 15  # 每15秒检查一次，提高响应速度
+        check_interval = 15  # 无任务结束时每15秒检查一次，任务结束时立即检查
         max_wait_time = 7200  # 最大等待时间2小时
         early_exit_threshold = 0.8  # 如果80%的任务都失败了，提前退出
         
+        # 循环内不变的总数和百分比系数只计算一次
+        total_tasks = len(submitted_tasks)
+        percent_per_task = 100.0 / total_tasks if total_tasks else 0.0
+        failure_limit = early_exit_threshold * total_tasks
+        
         start_time = time.time()
         consecutive_failures = 0  # 连续失败计数
         last_failure_time = time.time()  # 最后一次失败时间
+        last_status_counts = None  # 上一次输出的 (运行中, 已完成, 失败) 计数
         
         while time.time() - start_time < max_wait_time:
             # 获取当前任务状态
@@ -634,29 +866,36 @@ def main():
             completed_count = len(all_tasks["completed"])
             failed_count = len(all_tasks["failed"])
             
-            logger.info(f"📊 当前状态 - 运行中: {running_count}, 已完成: {completed_count}, 失败: {failed_count}")
+            # 状态计数与上一轮相同时不重复输出
+            status_counts = (running_count, completed_count, failed_count)
+            if status_counts != last_status_counts:
+                logger.info(f"📊 当前状态 - 运行中: {running_count}, 已完成: {completed_count}, 失败: {failed_count}")
+                last_status_counts = status_counts
             
-            # 检查是否有新完成的任务
+            # 检查是否有新完成的任务：与上一轮已处理的任务做差集，每轮只查询一次任务状态
             new_failures = 0
-            for task_info in submitted_tasks:
-                task_id = task_info["task_id"]
-                result = manager.get_experiment_result(task_id)
-                
-                if result and result.status.value in [8, 9]:  # 8=completed, 9=failed
-                    if task_info not in completed_tasks and task_info not in failed_tasks:
-                        if result.status.value == 8:  # completed
-                            completed_tasks.append(task_info)
-                            logger.info(f"🎉 实验 {task_info['index']}/20 完成: {task_info['config']['output_dir']}")
-                            if result.metrics:
-                                logger.info(f"   📊 指标: {result.metrics}")
-                            # 重置连续失败计数
-                            consecutive_failures = 0
-                        else:  # failed
-                            failed_tasks.append(task_info)
-                            new_failures += 1
-                            logger.error(f"❌ 实验 {task_info['index']}/20 失败: {task_info['config']['output_dir']}")
-                            if result.error_message:
-                                logger.error(f"   💥 错误: {result.error_message}")
+            for task in all_tasks["completed"]:
+                task_info = task_info_by_id.get(task.task_id)
+                if task_info is None or task.task_id in finished_task_ids:
+                    continue
+                finished_task_ids.add(task.task_id)
+                completed_tasks.append(task_info)
+                logger.info(f"🎉 实验 {task_info['index']}/20 完成: {task_info['config']['output_dir']}")
+                if task.result and task.result.metrics:
+                    logger.info(f"   📊 指标: {task.result.metrics}")
+                # 重置连续失败计数
+                consecutive_failures = 0
+            
+            for task in all_tasks["failed"]:
+                task_info = task_info_by_id.get(task.task_id)
+                if task_info is None or task.task_id in finished_task_ids:
+                    continue
+                finished_task_ids.add(task.task_id)
+                failed_tasks.append(task_info)
+                new_failures += 1
+                logger.error(f"❌ 实验 {task_info['index']}/20 失败: {task_info['config']['output_dir']}")
+                if task.error_message:
+                    logger.error(f"   💥 错误: {task.error_message}")
             
             # 更新连续失败计数
             if new_failures > 0:
@@ -668,18 +907,18 @@ def main():
                     consecutive_failures = max(0, consecutive_failures - 1)
             
             # 检查是否所有任务都完成了
-            if len(completed_tasks) + len(failed_tasks) == len(submitted_tasks):
+            if len(completed_tasks) + len(failed_tasks) == total_tasks:
                 logger.info("🎯 所有实验任务已完成！")
                 break
             
             # 检查是否应该提前退出（大量任务失败）
-            if len(failed_tasks) > 0 and len(failed_tasks) / len(submitted_tasks) >= early_exit_threshold:
-                logger.warning(f"⚠️  失败率过高 ({len(failed_tasks)}/{len(submitted_tasks)} = {len(failed_tasks)/len(submitted_tasks)*100:.1f}%)，提前退出监控")
+            if len(failed_tasks) > 0 and len(failed_tasks) >= failure_limit:
+                logger.warning(f"⚠️  失败率过高 ({len(failed_tasks)}/{total_tasks} = {len(failed_tasks) * percent_per_task:.1f}%)，提前退出监控")
                 break
             
             # 直接使用 manager 的状态来判断退出条件
-            if failed_count > 0 and failed_count / len(submitted_tasks) >= early_exit_threshold:
-                logger.warning(f"⚠️  失败率过高 ({failed_count}/{len(submitted_tasks)} = {failed_count/len(submitted_tasks)*100:.1f}%)，提前退出监控")
+            if failed_count > 0 and failed_count >= failure_limit:
+                logger.warning(f"⚠️  失败率过高 ({failed_count}/{total_tasks} = {failed_count * percent_per_task:.1f}%)，提前退出监控")
                 break
             
             # 检查连续失败是否过多
@@ -695,12 +934,14 @@ def main():
                     break
             
             # 额外检查：如果所有任务都失败了，立即退出
-            if failed_count == len(submitted_tasks) and running_count == 0:
-                logger.warning(f"⚠️  所有任务都失败了 ({failed_count}/{len(submitted_tasks)})，立即退出监控")
+            if failed_count == total_tasks and running_count == 0:
+                logger.warning(f"⚠️  所有任务都失败了 ({failed_count}/{total_tasks})，立即退出监控")
                 break
             
-            # 等待一段时间再检查
-            time.sleep(check_interval)
+            # 等待任务结束事件，最长 check_interval 秒；先清除事件再进入下一轮快照，不会漏掉完成通知
+            flush_logging()
+            manager.task_done_event.wait(timeout=check_interval)
+            manager.task_done_event.clear()
         
         # 打印最终统计结果
         logger.info("=" * 60)
@@ -742,15 +983,15 @@ def main():
         # 打印最终状态
         manager.print_status()
         
-        # 停止管理器
-        manager.stop()
-        
     except Exception as e:
-        logger.error(f"❌ 主函数执行出错: {e}")
-        import traceback
-        logger.error(f"详细错误信息: {traceback.format_exc()}")
+        logger.exception(f"❌ 主函数执行出错: {e}")
+    finally:
+        # 停止管理器（出错时同样执行，确保摘要汇总文件被关闭）
+        if manager is not None:
+            manager.stop()
     
     logger.info("🏁 SATuSGH LabGrid 示例结束")
+    flush_logging()
 
 
 if __name__ == "__main__":
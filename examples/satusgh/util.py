@@ -17,10 +17,18 @@ SATuSGH (Satellite Network Topology Generator) 卫星网络拓扑生成器
 import os
 import re
 import sys
-import glob
 import json
 import csv
+import itertools
+import bisect
+import operator
+import time
+import io
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from labkit.builder.labbook_builder import Builder
 from labkit.models.labbook import Labbook
 from labkit.models.network import Image, ImageType, Node, Interface, InterfaceMode, Link, VolumeMount
@@ -32,6 +40,55 @@ import yaml
 from typing import Dict, Any, Optional, List, Tuple
 import argparse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 卫星节点的 5 个接口名（eth0-eth3 星间链路，eth4 星地链路），预先生成避免每个节点重复格式化
+_SAT_ETH_NAMES = tuple(f'eth{j}' for j in range(5))
+
+# ospf6d 配置模板中路由器ID的占位符
+_ROUTER_ID_PLACEHOLDER = "__ROUTER_ID__"
+
+# 一次替换同时去掉 ospf6d 配置中的说明文字和 BFD 相关行（含行尾换行）
+_OSPF6D_STRIP_RE = re.compile(r'这是 ospf6d 的配置|^[ \t]*(?:ipv6 ospf6 bfd|bfd).*\n?', re.MULTILINE)
+
+@lru_cache(maxsize=None)
+def _ospf6d_conf_template(interfaces: Tuple[str, ...]) -> str:
+    """
+    生成去掉 BFD 相关行的 ospf6d 配置模板（按接口列表缓存）
+    
+    同一接口列表的节点只有路由器ID不同，渲染和过滤只需执行一次。
+    
+    Args:
+        interfaces: 接口名元组
+        
+    Returns:
+        str: 以 _ROUTER_ID_PLACEHOLDER 作为路由器ID的配置模板
+    """
+    ospf6d_conf = generate_ospf6d_config(
+            interfaces=list(interfaces),
+            router_id=_ROUTER_ID_PLACEHOLDER,
+            bfd_profile="",
+            log_file="/var/log/frr/ospf6d.log",
+            log_precision=6,
+            hello_interval=3
+        )
+    return _OSPF6D_STRIP_RE.sub('', ospf6d_conf)
+
+# BFD 配置脚本的固定头部
+_BFD_SH_HEADER = "\n".join([
+    "vtysh <<EOF",
+    "configure terminal",
+    "bfd",
+    " profile bfdd",
+    "  transmit-interval 50", # 50ms -> 50 ms
+    "  receive-interval 50", # 50ms -> 50 ms
+    "  detect-multiplier 3",
+    " exit"
+])
+
 class BgNetConfig:
     def __init__(self, config_path: str):
         pass
@@ -51,6 +108,9 @@ class BgNet:
         self.phase_shift = phase_shift
         self.sat_names = []
         self.gs_names = []
+        # get_nodes/get_links 的缓存，拓扑生成后不再变化
+        self._nodes_cache: Optional[List[Node]] = None
+        self._links_cache: Optional[List[Link]] = None
         
         self._generate_network()
         
@@ -61,72 +121,83 @@ class BgNet:
         
         image_repo = "ponedo/frr-ubuntu20:tiny"
         
-        # 生成背景网络卫星节点
-        for i in range(N * M):
-            sat_node = Node.template(
-                name=f'bg_sat_{i}',
+        # 预先生成节点名，节点和链路端点共用，避免在循环中反复格式化
+        sat_names = self.sat_names = [f'bg_sat_{i}' for i in range(N * M)]
+        gs_names = self.gs_names = [f'bg_gs_{i}' for i in range(self.gs_count)]
+        
+        # 生成背景网络卫星节点（节点和链路数量均已知，直接按最终大小构造列表）
+        self.sat_nodes = [
+            Node.template(
+                name=name,
                 image=image_repo,
-                interfaces=[Interface.template(name=f'eth{j}', mode=InterfaceMode.DIRECT) for j in range(5)],
+                interfaces=[Interface.template(name=eth, mode=InterfaceMode.DIRECT) for eth in _SAT_ETH_NAMES],
                 volumes=[],
                 ext={}
             )
-            self.sat_nodes.append(sat_node)
+            for name in sat_names
+        ]
         
         # 生成背景网络地面站节点
-        for i in range(self.gs_count):
-            gs_node = Node.template(
-                name=f'bg_gs_{i}',
+        self.gs_nodes = [
+            Node.template(
+                name=name,
                 image=image_repo,
                 interfaces=[Interface.template(name='eth0', mode=InterfaceMode.DIRECT)],
                 volumes=[],
                 ext={}
             )
-            self.gs_nodes.append(gs_node)
+            for name in gs_names
+        ]
         
         # 生成背景网络twisted torus链路
         def bg_sat_idx(row, col):
             return row * M + col
         
-        link_id = 0
-        # 生成卫星节点之间的链路
+        # 生成卫星节点之间的链路：每个卫星两条，第 idx 个卫星的链路ID为 2*idx 和 2*idx+1
+        s2s_links = self.s2s_links = [None] * (2 * N * M)
         for row in range(N):
             for col in range(M):
                 idx = bg_sat_idx(row, col)
+                link_id = 2 * idx
                 # 上邻居（垂直连接）
                 up_row = (row - 1) % N
                 up_col = (col + self.phase_shift) % M
                 up_idx = bg_sat_idx(up_row, up_col)
-                self.s2s_links.append(Link.template(
-                    endpoints=[f'bg_sat_{idx}:eth0', f'bg_sat_{up_idx}:eth2'],
+                s2s_links[link_id] = Link.template(
+                    endpoints=[sat_names[idx] + ':eth0', sat_names[up_idx] + ':eth2'],
                     id=f'bg_link_{link_id}'
-                ))
-                link_id += 1
+                )
                 
                 # 右邻居（水平连接）
                 right_row = (row + self.phase_shift) % N
                 right_col = (col + 1) % M
                 right_idx = bg_sat_idx(right_row, right_col)
-                self.s2s_links.append(Link.template(
-                    endpoints=[f'bg_sat_{idx}:eth1', f'bg_sat_{right_idx}:eth3'],
-                    id=f'bg_link_{link_id}'
-                ))
-                link_id += 1
-        
-        # 连接背景网络地面站
-        for i in range(self.gs_count):
-            self.g2s_links.append(Link.template(
-                endpoints=[f'bg_sat_{i}:eth4', f'bg_gs_{i}:eth0'],
-                id=f'bg_link_{link_id}'
-            ))
-            link_id += 1
+                s2s_links[link_id + 1] = Link.template(
+                    endpoints=[sat_names[idx] + ':eth1', sat_names[right_idx] + ':eth3'],
+                    id=f'bg_link_{link_id + 1}'
+                )
+        
+        # 连接背景网络地面站，链路ID接在卫星间链路之后
+        link_id_base = len(s2s_links)
+        self.g2s_links = [
+            Link.template(
+                endpoints=[sat_names[i] + ':eth4', gs_names[i] + ':eth0'],
+                id=f'bg_link_{link_id_base + i}'
+            )
+            for i in range(self.gs_count)
+        ]
     
     def get_nodes(self) -> List[Node]:
-        """获取所有节点"""
-        return self.sat_nodes + self.gs_nodes
+        """获取所有节点（返回缓存列表，调用方不应修改）"""
+        if self._nodes_cache is None:
+            self._nodes_cache = self.sat_nodes + self.gs_nodes
+        return self._nodes_cache
     
     def get_links(self) -> List[Link]:
-        """获取所有链路"""
-        return self.s2s_links + self.g2s_links
+        """获取所有链路（返回缓存列表，调用方不应修改）"""
+        if self._links_cache is None:
+            self._links_cache = self.s2s_links + self.g2s_links
+        return self._links_cache
     
 
 class SATuSGHConfig:
@@ -158,6 +229,15 @@ class SATuSGHCoreNet:
         self.g2s_links: List[Link] = [] # 地面站到卫星链路
         self.s2s_links: List[Link] = [] # 卫星间链路
         self.configs: Dict[str, Dict[str, str]] = {} # 节点配置文件存储
+        # 用户和地面站 eth1 的 IPv6 地址（不带前缀长度），与接口 ip_list 同源，供事件生成复用
+        self.user_1_ipv6: Optional[str] = None
+        self.user_2_ipv6: Optional[str] = None
+        self.gs_1_eth1_ipv6: Optional[str] = None
+        self.gs_2_eth1_ipv6: Optional[str] = None
+        # get_nodes/get_links/get_node_names 的缓存，拓扑生成后不再变化
+        self._nodes_cache: Optional[List[Node]] = None
+        self._links_cache: Optional[List[Link]] = None
+        self._node_names_cache: Optional[List[str]] = None
         self._generate_network()
         
     @staticmethod
@@ -230,23 +310,11 @@ class SATuSGHCoreNet:
         Returns:
             str: BFD配置脚本内容
         """
-        lines = [
-            "vtysh <<EOF",
-            "configure terminal",
-            "bfd",
-            " profile bfdd",
-            "  transmit-interval 50", # 50ms -> 50 ms
-            "  receive-interval 50", # 50ms -> 50 ms
-            "  detect-multiplier 3",
-            " exit"
-        ]
-        for iface in interfaces:
-            lines.append(f"interface {iface}")
-            lines.append(" ipv6 ospf6 bfd")
-            lines.append(" ipv6 ospf6 bfd profile bfdd")
-            lines.append("exit")
-        lines.append("EOF")
-        return "\n".join(lines)
+        return "\n".join([
+            _BFD_SH_HEADER,
+            *[f"interface {iface}\n ipv6 ospf6 bfd\n ipv6 ospf6 bfd profile bfdd\nexit" for iface in interfaces],
+            "EOF"
+        ])
 
     @classmethod
     def generate_ospf6d_node_configs(cls, node_type: str, node_id: int, sat_grid_N: int, node: Node):
@@ -279,20 +347,8 @@ class SATuSGHCoreNet:
             lo_ipv6 = cls.get_lo_ipv6(node_id)
             interfaces = [iface.name for iface in node.interfaces]
             
-        # 生成OSPF6配置
-        ospf6d_conf = generate_ospf6d_config(
-                interfaces=interfaces,
-                router_id=router_id,
-                bfd_profile="",
-                log_file="/var/log/frr/ospf6d.log",
-                log_precision=6,
-                hello_interval=3
-            )
-        ospf6d_conf = ospf6d_conf.replace("这是 ospf6d 的配置", "")
-        ospf6d_conf = '\n'.join([
-            line for line in ospf6d_conf.split('\n')
-            if not line.strip().startswith('ipv6 ospf6 bfd') and not line.strip().startswith('bfd')
-        ])
+        # 生成OSPF6配置（模板按接口列表缓存，仅替换路由器ID）
+        ospf6d_conf = _ospf6d_conf_template(tuple(interfaces)).replace(_ROUTER_ID_PLACEHOLDER, router_id)
         
         # 生成Zebra配置
         zebra_iface = ZebraInterfaceConfig(interface="lo", ipv6_address=lo_ipv6)
@@ -378,6 +434,10 @@ class SATuSGHCoreNet:
         USER_2_IPV6 = "fd05::1/64"
         GS_1_ETH1_IPV6 = "fd04::2/64"
         GS_2_ETH1_IPV6 = "fd05::2/64"
+        self.user_1_ipv6 = USER_1_IPV6.split('/')[0]
+        self.user_2_ipv6 = USER_2_IPV6.split('/')[0]
+        self.gs_1_eth1_ipv6 = GS_1_ETH1_IPV6.split('/')[0]
+        self.gs_2_eth1_ipv6 = GS_2_ETH1_IPV6.split('/')[0]
         
         node_id = 0
         
@@ -411,7 +471,7 @@ class SATuSGHCoreNet:
             sat_node = Node.template(
                 name=f'Sat{i}',
                 image=image_repo,
-                interfaces=[Interface.template(name=f'eth{j}', mode=InterfaceMode.DIRECT) for j in range(5)],
+                interfaces=[Interface.template(name=eth, mode=InterfaceMode.DIRECT) for eth in _SAT_ETH_NAMES],
                 volumes=[
                     VolumeMount.template(host_path=f'Sat{i}/frr_conf', container_path='/etc/frr', mode='rw'),
                     VolumeMount.template(host_path=f'Sat{i}/frr_log', container_path='/var/log/frr', mode='rw'),
@@ -521,27 +581,33 @@ class SATuSGHCoreNet:
         # 检测协议: BFD (双向转发检测)
     
     def get_nodes(self) -> List[Node]:
-        """获取所有节点列表"""
-        return [self.user_1, self.user_2] + self.gs_nodes + self.sat_nodes
+        """获取所有节点列表（返回缓存列表，调用方不应修改）"""
+        if self._nodes_cache is None:
+            self._nodes_cache = [self.user_1, self.user_2] + self.gs_nodes + self.sat_nodes
+        return self._nodes_cache
     
     def get_links(self) -> List[Link]:
-        """获取所有链路列表"""
-        return self.u2g_links + self.g2s_links + self.s2s_links
+        """获取所有链路列表（返回缓存列表，调用方不应修改）"""
+        if self._links_cache is None:
+            self._links_cache = self.u2g_links + self.g2s_links + self.s2s_links
+        return self._links_cache
     
     def get_images(self) -> List[Image]:
         """获取所有镜像列表"""
         return self.images
     
     def get_node_names(self) -> List[str]:
-        """获取所有节点名称列表"""
-        node_names = []
-        if self.user_1:
-            node_names.append(self.user_1.name)
-        if self.user_2:
-            node_names.append(self.user_2.name)
-        node_names.extend([node.name for node in self.gs_nodes])
-        node_names.extend([node.name for node in self.sat_nodes])
-        return node_names
+        """获取所有节点名称列表（返回缓存列表，调用方不应修改）"""
+        if self._node_names_cache is None:
+            node_names = []
+            if self.user_1:
+                node_names.append(self.user_1.name)
+            if self.user_2:
+                node_names.append(self.user_2.name)
+            node_names.extend([node.name for node in self.gs_nodes])
+            node_names.extend([node.name for node in self.sat_nodes])
+            self._node_names_cache = node_names
+        return self._node_names_cache
     
     def init_mounts(self, mounts_dir: str):
         """
@@ -550,30 +616,25 @@ class SATuSGHCoreNet:
         Args:
             mounts_dir: 挂载点根目录
         """
-        # 生成卫星节点挂载点和配置文件
-        for sat_node in self.sat_nodes:
-            conf_dir = os.path.join(mounts_dir, sat_node.name, 'frr_conf')
-            log_dir = os.path.join(mounts_dir, sat_node.name, 'frr_log')
-            os.makedirs(conf_dir, exist_ok=True)
-            os.makedirs(log_dir, exist_ok=True)
-            
-            # 写入配置文件
-            node_cfg = self.configs[sat_node.name]
-            for fname, content in node_cfg.items():
-                with open(os.path.join(conf_dir, fname), 'w') as f:
-                    f.write(content)
-                    
-        # 生成地面站节点挂载点和配置文件
-        for gs_node in self.gs_nodes:
-            conf_dir = os.path.join(mounts_dir, gs_node.name, 'frr_conf')
-            log_dir = os.path.join(mounts_dir, gs_node.name, 'frr_log')
-            os.makedirs(conf_dir, exist_ok=True)
-            os.makedirs(log_dir, exist_ok=True)
+        # 根目录只 makedirs 一次，其下各级父目录已知存在，直接逐级 mkdir，
+        # 省去 makedirs 每次对父目录的重复检查
+        os.makedirs(mounts_dir, exist_ok=True)
+        configs = self.configs
+        join = os.path.join
+        
+        # 为卫星节点和地面站节点生成挂载点并写入配置文件
+        for node in itertools.chain(self.sat_nodes, self.gs_nodes):
+            node_dir = join(mounts_dir, node.name)
+            conf_dir = join(node_dir, 'frr_conf')
+            for d in (node_dir, conf_dir, join(node_dir, 'frr_log')):
+                try:
+                    os.mkdir(d)
+                except FileExistsError:
+                    pass
             
             # 写入配置文件
-            node_cfg = self.configs[gs_node.name]
-            for fname, content in node_cfg.items():
-                with open(os.path.join(conf_dir, fname), 'w') as f:
+            for fname, content in configs[node.name].items():
+                with open(join(conf_dir, fname), 'w') as f:
                     f.write(content)
 
 class SATuSGHLabGen:
@@ -608,6 +669,8 @@ class SATuSGHLabGen:
         self.core_net = SATuSGHCoreNet()  # 核心网络
         self.bg_net = BgNet(grid_h=6, grid_w=8, gs_count=4, phase_shift=1)  # 背景网络
         self.builder = Builder(output_dir=output_dir)  # 实验构建器
+        self._all_nodes: List[Node] = []  # init_network 合并后的全部节点
+        self._all_links: List[Link] = []  # init_network 合并后的全部链路
 
         self.link_delete_offset = link_delete_offset  # 删除链路的时间偏移量
         self.link_create_offset = link_create_offset  # 创建链路的时间偏移量
@@ -619,52 +682,60 @@ class SATuSGHLabGen:
 
     def init_network(self):
         """初始化网络拓扑"""
-        # 合并所有节点和链路
-        all_nodes = self.core_net.get_nodes()
-        all_links = self.core_net.get_links()
-        if self.bg_net:
-            all_nodes.extend(self.bg_net.get_nodes())
-            all_links.extend(self.bg_net.get_links())
-
         # 添加所有镜像到builder
         for image in self.core_net.get_images():
             self.builder.add_image(image)
 
-        # 添加所有节点到builder
-        for node in all_nodes:
-            self.builder.add_node(node)
+        # 合并核心网络和背景网络的节点、链路，只合并一次并保存供后续事件复用
+        self._all_nodes = list(itertools.chain(
+            self.core_net.get_nodes(), self.bg_net.get_nodes() if self.bg_net else ()))
+        self._all_links = list(itertools.chain(
+            self.core_net.get_links(), self.bg_net.get_links() if self.bg_net else ()))
+        self.builder.add_nodes(self._all_nodes)
+        self.builder.add_links(self._all_links)
 
-        # 添加所有链路到builder
-        for link in all_links:
-            self.builder.add_link(link)
-
-        print(f"网络拓扑初始化完成: {len(all_nodes)} 节点, {len(all_links)} 链路")
+        print(f"网络拓扑初始化完成: {len(self.builder.nodes)} 节点, {len(self.builder.links)} 链路")
 
     def add_link_control_events(self):
         """添加链路控制事件（设置链路延迟等属性）"""
         if not self.builder:
             raise ValueError("请先调用 init_network() 初始化网络")
 
-        # 获取所有链路
-        all_links = self.core_net.get_links()
-
-        if self.bg_net:
-            all_links.extend(self.bg_net.get_links())
-
-        # 创建链路属性事件
-        events = []
-        for i, link in enumerate(all_links):
-            link_id = link.id if hasattr(link, 'id') else f'link{i}'
-            link_properties = self.builder.new_link_properties(mode="up", delay="0ms")
-            link_attr_set_event = self.builder.new_network_link_attr_set_event(id=link_id, link_properties=link_properties)
-            events.append(link_attr_set_event)
+        # 创建链路属性事件（复用 init_network 合并好的链路列表）
+        # Link.id 为必填字段，无需 hasattr 检查；所有链路属性相同，共用同一个 LinkProperties 实例（之后不再修改）
+        link_properties = self.builder.new_link_properties(mode="up", delay="0ms")
+        new_attr_set_event = self.builder.new_network_link_attr_set_event
+        events = [
+            new_attr_set_event(id=link.id, link_properties=link_properties)
+            for link in self._all_links
+        ]
 
         # 添加链路属性设置事件到时间线
-        link_attr_set_action = self.builder.build_network_events_action(events, "all_links_attr_set")
+        link_attr_set_action = self.builder.create_network_events_action(events, "all_links_attr_set")
         self.builder.add_timeline_item(at=self.TIMELINE_LINK_ATTR_SET, description="set all links delay 0ms", action=link_attr_set_action)
 
         print("链路控制事件添加完成")
 
+    def _build_core_nodes_shell_action(self, shellcodes: List[str], action_name: str):
+        """
+        为每个核心网络节点创建执行同一组命令的 netfunc 事件，并聚合为一个 action
+
+        Args:
+            shellcodes: 每个节点上执行的命令列表
+            action_name: action 名称
+
+        Returns:
+            聚合后的 netfunc 事件 action
+        """
+        builder = self.builder
+        new_exec_args = builder.new_node_exec_args
+        new_netfunc_event = builder.new_netfunc_event
+        netfunc_events = [
+            new_netfunc_event(node_name=name, exec_args=new_exec_args(shellcodes=shellcodes))
+            for name in self.core_net.get_node_names()
+        ]
+        return builder.create_netfunc_events_action(netfunc_events, action_name)
+
     def add_frr_start_events(self):
         """添加FRR启动事件"""
         if not self.builder:
@@ -672,12 +743,8 @@ class SATuSGHLabGen:
 
         # 为核心网络节点创建FRR启动命令
         core_node_names = self.core_net.get_node_names()
-        netfunc_events = []
-        for name in core_node_names:
-            exec_args = self.builder.new_node_exec_args(shellcodes=['chown -R frr:frr /var/log/frr', '/usr/lib/frr/frrinit.sh start'])
-            netfunc_event = self.builder.new_netfunc_event(node_name=name, exec_args=exec_args)
-            netfunc_events.append(netfunc_event)
-        netfunc_action = self.builder.build_netfunc_events_action(netfunc_events, "all_nodes_frr_start")
+        netfunc_action = self._build_core_nodes_shell_action(
+            ['chown -R frr:frr /var/log/frr', '/usr/lib/frr/frrinit.sh start'], "all_nodes_frr_start")
         self.builder.add_timeline_item(at=self.TIMELINE_FRR_START, description="start frr on all nodes", action=netfunc_action)
 
         print(f"FRR启动事件添加完成: {len(core_node_names)} 个核心网络节点")
@@ -689,12 +756,7 @@ class SATuSGHLabGen:
 
         # 为核心网络节点创建BFD配置命令
         core_node_names = self.core_net.get_node_names()
-        bfd_events = []
-        for name in core_node_names:
-            exec_args = self.builder.new_node_exec_args(shellcodes=['bash /etc/frr/bfd.sh'])
-            bfd_event = self.builder.new_netfunc_event(node_name=name, exec_args=exec_args)
-            bfd_events.append(bfd_event)
-        bfd_action = self.builder.build_netfunc_events_action(bfd_events, "all_nodes_bfd_config")
+        bfd_action = self._build_core_nodes_shell_action(['bash /etc/frr/bfd.sh'], "all_nodes_bfd_config")
         self.builder.add_timeline_item(at=self.TIMELINE_BFD_CONFIG, description="configure bfd on all nodes", action=bfd_action)
 
         print(f"BFD配置事件添加完成: {len(core_node_names)} 个核心网络节点")
@@ -707,12 +769,10 @@ class SATuSGHLabGen:
         user_1 = self.core_net.user_1
         user_2 = self.core_net.user_2
 
-        user_2_eth0_ipv6 = user_2.interfaces[0].ip_list[0].split('/')[0]
-
         # 创建ping测试事件
-        exec_args = self.builder.new_node_exec_args(shellcodes=[f'ping6 -D -c 10000 -i 0.003 {user_2_eth0_ipv6}'], daemon=False, output=None)
+        exec_args = self.builder.new_node_exec_args(shellcodes=[f'ping6 -D -c 10000 -i 0.003 {self.core_net.user_2_ipv6}'], daemon=False, output=None)
         netfunc_event = self.builder.new_netfunc_exec_output_event(node_name=user_1.name, exec_args=exec_args)
-        action = self.builder.build_netfunc_exec_output_event_action(netfunc_event, name="user1_ping_gs1")
+        action = self.builder.create_netfunc_exec_output_event_action(netfunc_event, name="user1_ping_gs1")
         self.builder.add_timeline_item(at=self.TIMELINE_PING_TEST, description=f"{user_1.name} ping {user_2.name} lo", action=action)
         print(f"Ping测试事件添加完成: {user_1.name} -> {user_2.name}")
 
@@ -723,7 +783,7 @@ class SATuSGHLabGen:
         # 7.5 添加链路切换事件：gs_1到sat0切换为gs_1到Sat2
         # 首先销毁原有链路（link1: gs_1:eth0 -> Sat0:eth4）
         link_destroy_event = self.builder.new_network_link_destroy_event(id='g2s_link_0')
-        link_destroy_action = self.builder.build_network_events_action([link_destroy_event], "destroy_gs1_sat0_link")
+        link_destroy_action = self.builder.create_network_events_action([link_destroy_event], "destroy_gs1_sat0_link")
         self.builder.add_timeline_item(at=self.TIMELINE_GSL_HANDOVER_DESTROY + self.link_delete_offset, description="destroy link gs_1:eth0 -> Sat0:eth4", action=link_destroy_action)
 
         # 然后创建新链路（gs_1:eth0 -> Sat2:eth4）
@@ -743,7 +803,7 @@ class SATuSGHLabGen:
             link_create_args=link_create_args,
             link_properties=link_properties
         )
-        link_create_action = self.builder.build_network_events_action([link_create_event], "create_gs1_sat2_link")
+        link_create_action = self.builder.create_network_events_action([link_create_event], "create_gs1_sat2_link")
         self.builder.add_timeline_item(at=self.TIMELINE_GSL_HANDOVER_CREATE + self.link_create_offset, description="create link gs_1:eth0 -> Sat2:eth4", action=link_create_action)
 
     def add_config_default_route_events(self):
@@ -754,19 +814,17 @@ class SATuSGHLabGen:
         user_events = []
         user_1 = self.core_net.user_1
         user_2 = self.core_net.user_2
-        GS_1_ETH1_IPV6 = "fd04::2"
-        GS_2_ETH1_IPV6 = "fd05::2"
 
-        # 为用户节点配置默认路由
-        exec_args = self.builder.new_node_exec_args(shellcodes=[f'ip -6 route add default via {GS_1_ETH1_IPV6}'])
+        # 为用户节点配置默认路由（网关地址取自核心网络，避免与接口配置不一致）
+        exec_args = self.builder.new_node_exec_args(shellcodes=[f'ip -6 route add default via {self.core_net.gs_1_eth1_ipv6}'])
         user_event = self.builder.new_netfunc_event(node_name=user_1.name, exec_args=exec_args)
         user_events.append(user_event)
 
-        exec_args = self.builder.new_node_exec_args(shellcodes=[f'ip -6 route add default via {GS_2_ETH1_IPV6}'])
+        exec_args = self.builder.new_node_exec_args(shellcodes=[f'ip -6 route add default via {self.core_net.gs_2_eth1_ipv6}'])
         user_event = self.builder.new_netfunc_event(node_name=user_2.name, exec_args=exec_args)
         user_events.append(user_event)
 
-        user_action = self.builder.build_netfunc_events_action(user_events, "all_users_default_route_config")
+        user_action = self.builder.create_netfunc_events_action(user_events, "all_users_default_route_config")
         self.builder.add_timeline_item(at=self.TIMELINE_DEFAULT_ROUTE, description="configure default route on all users", action=user_action)
         print("路由配置事件添加完成")
 
@@ -796,9 +854,19 @@ class SATuSGHLabGen:
         self.core_net.init_mounts(mounts_dir)
 
 
+# ping 输出行的正则，预编译一次供 parse_file 逐行匹配
+# 成功响应: [timestamp] 64 bytes from fd05::1: icmp_seq=X ttl=59 time=Y ms
+_PING_SUCCESS_RE = re.compile(r'\[(\d+\.\d+)\]\s+64\s+bytes\s+from\s+fd05::1:\s+icmp_seq=(\d+)\s+ttl=\d+\s+time=(\d+\.?\d*)\s+ms')
+# 错误响应: [timestamp] From fd04::2 icmp_seq=X Destination unreachable: No route
+_PING_ERROR_RE = re.compile(r'\[(\d+\.\d+)\]\s+From\s+fd04::2\s+icmp_seq=(\d+)\s+Destination\s+unreachable:\s+No\s+route')
+
+
 class PingDataPoint:
     """单个ping数据点"""
     
+    # 单个文件可有上万个数据点，使用 __slots__ 减少每个对象的内存和创建开销
+    __slots__ = ('timestamp', 'seq_num', 'response_time', 'is_success', 'error_msg')
+    
     def __init__(self, timestamp: float, seq_num: int, response_time: Optional[float] = None, 
                  is_success: bool = True, error_msg: str = ""):
         self.timestamp = timestamp
@@ -832,145 +900,178 @@ class PingAnalyzer:
         
         print(f"正在解析文件: {file_path}")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
         parsed_count = 0
         error_count = 0
+        unparsed_messages = []  # 前10个无法解析的行，解析结束后一次性打印
+        match_success = _PING_SUCCESS_RE.match
+        match_error = _PING_ERROR_RE.match
+        append_point = self.data_points.append
         
-        for line_num, line in enumerate(lines, 1):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # 跳过标题行
-            if line.startswith('PING '):
-                continue
-            
-            # 解析成功响应: [timestamp] 64 bytes from fd05::1: icmp_seq=X ttl=59 time=Y ms
-            success_match = re.match(r'\[(\d+\.\d+)\]\s+64\s+bytes\s+from\s+fd05::1:\s+icmp_seq=(\d+)\s+ttl=\d+\s+time=(\d+\.?\d*)\s+ms', line)
-            if success_match:
-                timestamp = float(success_match.group(1))
-                seq_num = int(success_match.group(2))
-                response_time = float(success_match.group(3))
+        # 逐行流式读取，不再一次性 readlines() 把整个文件保存为行列表
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
                 
-                data_point = PingDataPoint(
-                    timestamp=timestamp,
-                    seq_num=seq_num,
-                    response_time=response_time,
-                    is_success=True
-                )
-                self.data_points.append(data_point)
-                parsed_count += 1
-                continue
-            
-            # 解析错误响应: [timestamp] From fd04::2 icmp_seq=X Destination unreachable: No route
-            error_match = re.match(r'\[(\d+\.\d+)\]\s+From\s+fd04::2\s+icmp_seq=(\d+)\s+Destination\s+unreachable:\s+No\s+route', line)
-            if error_match:
-                timestamp = float(error_match.group(1))
-                seq_num = int(error_match.group(2))
+                # 解析成功响应: [timestamp] 64 bytes from fd05::1: icmp_seq=X ttl=59 time=Y ms
+                # 成功行占绝大多数，最先尝试，使其只经过一次正则匹配
+                success_match = match_success(line)
+                if success_match:
+                    timestamp, seq_num, response_time = success_match.groups()
+                    append_point(PingDataPoint(float(timestamp), int(seq_num), float(response_time), True))
+                    parsed_count += 1
+                    continue
                 
-                data_point = PingDataPoint(
-                    timestamp=timestamp,
-                    seq_num=seq_num,
-                    is_success=False,
-                    error_msg="Destination unreachable: No route"
-                )
-                self.data_points.append(data_point)
-                parsed_count += 1
-                continue
-            
-            # 如果都不匹配，记录错误
-            error_count += 1
-            if error_count <= 10:  # 只显示前10个错误
-                print(f"无法解析第{line_num}行: {line}")
+                # 解析错误响应: [timestamp] From fd04::2 icmp_seq=X Destination unreachable: No route
+                # 先用子串判断过滤，只有可能匹配的行才进入正则
+                if 'Destination unreachable' in line:
+                    error_match = match_error(line)
+                    if error_match:
+                        timestamp, seq_num = error_match.groups()
+                        append_point(PingDataPoint(float(timestamp), int(seq_num), None, False,
+                                                   "Destination unreachable: No route"))
+                        parsed_count += 1
+                        continue
+                elif line.startswith('PING '):
+                    # 跳过标题行
+                    continue
+                
+                # 如果都不匹配，记录错误
+                error_count += 1
+                if error_count <= 10:  # 只显示前10个错误
+                    unparsed_messages.append(f"无法解析第{line_num}行: {line}")
         
+        if unparsed_messages:
+            print('\n'.join(unparsed_messages))
         print(f"解析完成: 成功解析 {parsed_count} 行，无法解析 {error_count} 行")
         return True
     
-    def analyze_outages(self, min_outage_duration: float = 1.0) -> None:
-        """分析服务中断时间段"""
+    def analyze_outages(self, min_outage_duration: float = 1.0, keep_outage_details: bool = True) -> None:
+        """
+        分析服务中断时间段
+
+        Args:
+            min_outage_duration: 最小中断时长（秒）
+            keep_outage_details: 是否保留每次中断的详细信息；为 False 时只计算统计信息，outages 为空
+        """
         if not self.data_points:
             print("没有数据点可供分析")
             return
         
-        # 按时间戳排序
-        self.data_points.sort(key=lambda x: x.timestamp)
+        # 按时间戳排序：ping 日志本身按时间顺序输出，通常已有序，
+        # 先单次扫描检查，发现逆序时才排序
+        prev_timestamp = float('-inf')
+        for point in self.data_points:
+            if point.timestamp < prev_timestamp:
+                self.data_points.sort(key=operator.attrgetter('timestamp'))
+                break
+            prev_timestamp = point.timestamp
         
-        outages = []
+        spans = []  # 达到最小时长的中断区间 (开始时间, 结束时间, 持续时间)
         outage_start = None
         outage_end = None
         
-        for i, point in enumerate(self.data_points):
-            if not point.is_success:
-                # 发现错误点
-                if outage_start is None:
-                    # 开始新的中断
-                    outage_start = point.timestamp
-                    outage_end = point.timestamp
-                else:
-                    # 继续当前中断
-                    outage_end = point.timestamp
-            else:
+        # 单次遍历按连续失败点划分中断区间；成功点占绝大多数，放在第一个分支
+        for point in self.data_points:
+            if point.is_success:
                 # 发现成功点
                 if outage_start is not None:
                     # 结束当前中断
                     duration = outage_end - outage_start
                     if duration >= min_outage_duration:
-                        outages.append({
-                            'start_time': outage_start,
-                            'end_time': outage_end,
-                            'duration': duration,
-                            'start_seq': self._find_seq_at_time(outage_start),
-                            'end_seq': self._find_seq_at_time(outage_end)
-                        })
+                        spans.append((outage_start, outage_end, duration))
                     outage_start = None
-                    outage_end = None
+            else:
+                # 发现错误点：延长当前中断，或以此点开始新的中断
+                outage_end = point.timestamp
+                if outage_start is None:
+                    outage_start = outage_end
         
         # 处理最后一个中断（如果文件以错误结束）
         if outage_start is not None:
             duration = outage_end - outage_start
             if duration >= min_outage_duration:
+                spans.append((outage_start, outage_end, duration))
+        
+        outages = []
+        if spans and keep_outage_details:
+            # 时间戳列表只构建一次，供各中断端点二分查找序列号
+            timestamps = [p.timestamp for p in self.data_points]
+            for start, end, duration in spans:
                 outages.append({
-                    'start_time': outage_start,
-                    'end_time': outage_end,
+                    'start_time': start,
+                    'end_time': end,
                     'duration': duration,
-                    'start_seq': self._find_seq_at_time(outage_start),
-                    'end_seq': self._find_seq_at_time(outage_end)
+                    'start_seq': self._find_seq_at_time(start, timestamps),
+                    'end_seq': self._find_seq_at_time(end, timestamps)
                 })
         
         self.outages = outages
-        self._calculate_stats()
+        self._calculate_stats([duration for _, _, duration in spans])
     
-    def _find_seq_at_time(self, timestamp: float) -> Optional[int]:
-        """根据时间戳查找序列号"""
-        for point in self.data_points:
-            if abs(point.timestamp - timestamp) < 0.001:  # 允许小的误差
-                return point.seq_num
+    def _find_seq_at_time(self, timestamp: float, timestamps: Optional[List[float]] = None) -> Optional[int]:
+        """
+        根据时间戳查找序列号
+
+        要求 data_points 已按时间戳排序，返回误差范围内的第一个数据点的序列号。
+
+        Args:
+            timestamp: 时间戳
+            timestamps: 与 data_points 一一对应的时间戳列表，未提供时现场构建
+
+        Returns:
+            Optional[int]: 序列号，找不到时返回 None
+        """
+        if timestamps is None:
+            timestamps = [p.timestamp for p in self.data_points]
+        
+        # 二分定位后向前回退到误差范围内的第一个点（允许小的误差）
+        i = bisect.bisect_left(timestamps, timestamp)
+        while i > 0 and abs(timestamps[i - 1] - timestamp) < 0.001:
+            i -= 1
+        if i < len(timestamps) and abs(timestamps[i] - timestamp) < 0.001:
+            return self.data_points[i].seq_num
         return None
     
-    def _calculate_stats(self) -> None:
-        """计算统计信息"""
+    def _calculate_stats(self, durations: Optional[List[float]] = None) -> None:
+        """
+        计算统计信息
+
+        Args:
+            durations: 各次中断的持续时间，未提供时从 outages 中提取
+        """
         if not self.data_points:
             return
         
         total_points = len(self.data_points)
-        success_points = sum(1 for p in self.data_points if p.is_success)
+        
+        # 单次遍历同时统计成功点数并收集响应时间；求和与最值交给内置函数在 C 层完成
+        success_points = 0
+        response_times = []
+        append_response_time = response_times.append
+        for p in self.data_points:
+            if p.is_success:
+                success_points += 1
+                if p.response_time is not None:
+                    append_response_time(p.response_time)
         error_points = total_points - success_points
         
-        # 计算响应时间统计
-        response_times = [p.response_time for p in self.data_points if p.is_success and p.response_time is not None]
+        # 中断时长只提取一次，总时长同时用于计算平均值
+        if durations is None:
+            durations = [o['duration'] for o in self.outages]
+        total_outage_duration = sum(durations)
         
         stats = {
             'total_points': total_points,
             'success_points': success_points,
             'error_points': error_points,
             'success_rate': success_points / total_points * 100 if total_points > 0 else 0,
-            'outage_count': len(self.outages),
-            'total_outage_duration': sum(o['duration'] for o in self.outages),
-            'avg_outage_duration': sum(o['duration'] for o in self.outages) / len(self.outages) if self.outages else 0,
-            'min_outage_duration': min(o['duration'] for o in self.outages) if self.outages else 0,
-            'max_outage_duration': max(o['duration'] for o in self.outages) if self.outages else 0
+            'outage_count': len(durations),
+            'total_outage_duration': total_outage_duration,
+            'avg_outage_duration': total_outage_duration / len(durations) if durations else 0,
+            'min_outage_duration': min(durations) if durations else 0,
+            'max_outage_duration': max(durations) if durations else 0
         }
         
         if response_times:
@@ -1011,10 +1112,16 @@ class PingAnalyzer:
         
         if self.outages:
             print(f"\n详细中断信息:")
+            # time.strftime + time.localtime 直接在 C 层格式化，不再为每个时间点创建 datetime 对象；
+            # 所有中断信息拼接后一次性打印
+            strftime = time.strftime
+            localtime = time.localtime
+            lines = []
             for i, outage in enumerate(self.outages, 1):
-                start_time = datetime.fromtimestamp(outage['start_time']).strftime('%Y-%m-%d %H:%M:%S')
-                end_time = datetime.fromtimestamp(outage['end_time']).strftime('%H:%M:%S')
-                print(f"  中断 {i}: {start_time} - {end_time} (持续 {outage['duration']:.2f}秒, 序列 {outage['start_seq']}-{outage['end_seq']})")
+                start_time = strftime('%Y-%m-%d %H:%M:%S', localtime(outage['start_time']))
+                end_time = strftime('%H:%M:%S', localtime(outage['end_time']))
+                lines.append(f"  中断 {i}: {start_time} - {end_time} (持续 {outage['duration']:.2f}秒, 序列 {outage['start_seq']}-{outage['end_seq']})")
+            print('\n'.join(lines))
     
     def save_results(self, output_file: str) -> None:
         """保存分析结果到JSON文件"""
@@ -1024,8 +1131,7 @@ class PingAnalyzer:
             'data_points_count': len(self.data_points)
         }
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        _write_json(results, output_file)
         
         print(f"\n结果已保存到: {output_file}")
     
@@ -1036,28 +1142,21 @@ class PingAnalyzer:
             writer = csv.writer(f)
             writer.writerow(['Timestamp', 'Sequence', 'Response_Time', 'Success', 'Error_Message'])
             
-            for point in self.data_points:
-                writer.writerow([
-                    point.timestamp,
-                    point.seq_num,
-                    point.response_time if point.response_time else '',
-                    point.is_success,
-                    point.error_msg
-                ])
+            # writerows 一次写出全部行，避免逐点调用 writerow
+            writer.writerows(
+                (point.timestamp, point.seq_num, point.response_time or '', point.is_success, point.error_msg)
+                for point in self.data_points
+            )
         
         # 导出中断信息
         with open(outage_file, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['Start_Time', 'End_Time', 'Duration', 'Start_Seq', 'End_Seq'])
             
-            for outage in self.outages:
-                writer.writerow([
-                    outage['start_time'],
-                    outage['end_time'],
-                    outage['duration'],
-                    outage['start_seq'],
-                    outage['end_seq']
-                ])
+            writer.writerows(
+                (outage['start_time'], outage['end_time'], outage['duration'], outage['start_seq'], outage['end_seq'])
+                for outage in self.outages
+            )
         
         print(f"数据已导出到: {data_file}")
         print(f"中断信息已导出到: {outage_file}")
@@ -1065,13 +1164,28 @@ class PingAnalyzer:
     # 批量分析相关方法
     def find_ping_files(self) -> List[str]:
         """查找所有ping数据文件"""
-        pattern = os.path.join(self.data_dir, "*.out")
-        files = glob.glob(pattern)
-        return sorted(files)
+        return _find_ping_files(self.data_dir)
     
-    def analyze_all_files(self, min_duration: float = 1.0) -> Dict:
-        """分析所有文件"""
-        files = self.find_ping_files()
+    def analyze_all_files(self, min_duration: float = 1.0, workers: Optional[int] = None,
+                          files: Optional[List[str]] = None, keep_outage_details: bool = True) -> Dict:
+        """
+        分析所有文件
+
+        各文件相互独立，多个文件时在进程池（spawn 启动，调用方可能是多线程进程）中并行解析和分析，
+        输出仍按文件顺序打印。
+
+        Args:
+            min_duration: 最小中断时长（秒）
+            workers: 并行进程数，默认取文件数与 CPU 核数的较小值；为 1 时在当前进程中顺序分析
+                （在工作线程中调用时应传 1，避免每次调用都启动进程池）
+            files: 已查找到的ping数据文件列表，未提供时扫描 data_dir
+            keep_outage_details: 是否在结果中保留每个文件的中断详情；只需汇总统计时传 False
+
+        Returns:
+            Dict: 每个文件的分析结果及 '_summary' 总体统计
+        """
+        if files is None:
+            files = self.find_ping_files()
         
         if not files:
             print(f"在目录 {self.data_dir} 中没有找到 *.out 文件")
@@ -1091,31 +1205,41 @@ class PingAnalyzer:
             'total_error_points': 0
         }
         
-        for file_path in files:
-            filename = os.path.basename(file_path)
-            print(f"\n{'='*60}")
-            print(f"分析文件: {filename}")
-            print(f"{'='*60}")
+        if workers is None:
+            workers = min(len(files), os.cpu_count() or 1)
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            # 子进程中收集打印内容再按文件顺序输出；顺序分析时直接打印，不替换全局 sys.stdout
+            if executor:
+                file_results = executor.map(_analyze_ping_file, files, itertools.repeat(min_duration),
+                                            itertools.repeat(keep_outage_details), itertools.repeat(True))
+            else:
+                file_results = map(_analyze_ping_file, files, itertools.repeat(min_duration),
+                                   itertools.repeat(keep_outage_details), itertools.repeat(False))
             
-            # 创建新的分析器实例处理单个文件
-            single_analyzer = PingAnalyzer()
-            if single_analyzer.parse_file(file_path):
-                single_analyzer.analyze_outages(min_duration)
-                single_analyzer.print_summary()
-                
-                # 保存单个文件结果
-                all_results[filename] = {
-                    'stats': single_analyzer.stats,
-                    'outages': single_analyzer.outages,
-                    'data_points_count': len(single_analyzer.data_points)
-                }
+            for file_path, (parsed, output, stats, outages, data_points_count) in zip(files, file_results):
+                filename = os.path.basename(file_path)
+                print(output, end='')
                 
-                # 累计统计
-                total_stats['total_outages'] += single_analyzer.stats.get('outage_count', 0)
-                total_stats['total_outage_duration'] += single_analyzer.stats.get('total_outage_duration', 0)
-                total_stats['total_data_points'] += single_analyzer.stats.get('total_points', 0)
-                total_stats['total_success_points'] += single_analyzer.stats.get('success_points', 0)
-                total_stats['total_error_points'] += single_analyzer.stats.get('error_points', 0)
+                if parsed:
+                    # 保存单个文件结果
+                    file_result = {'stats': stats}
+                    if keep_outage_details:
+                        file_result['outages'] = outages
+                    file_result['data_points_count'] = data_points_count
+                    all_results[filename] = file_result
+                    
+                    # 累计统计
+                    total_stats['total_outages'] += stats.get('outage_count', 0)
+                    total_stats['total_outage_duration'] += stats.get('total_outage_duration', 0)
+                    total_stats['total_data_points'] += stats.get('total_points', 0)
+                    total_stats['total_success_points'] += stats.get('success_points', 0)
+                    total_stats['total_error_points'] += stats.get('error_points', 0)
+        finally:
+            if executor:
+                executor.shutdown()
         
         # 计算总体统计
         if total_stats['total_data_points'] > 0:
@@ -1171,12 +1295,78 @@ class PingAnalyzer:
             print("没有批量分析结果可保存")
             return
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(self.batch_results, f, indent=2, ensure_ascii=False)
+        _write_json(self.batch_results, output_file)
         
         print(f"\n批量分析结果已保存到: {output_file}")
 
 
+def _write_json(data: Any, output_file: str) -> None:
+    """
+    以缩进格式写出 JSON 文件，安装了 orjson 时使用 orjson 直接写出字节
+
+    Args:
+        data: 要保存的数据
+        output_file: 输出文件路径
+    """
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def _find_ping_files(directory: str) -> List[str]:
+    """
+    查找目录下所有 ping 数据文件（*.out，不含隐藏文件），按路径排序
+
+    使用 os.scandir 单次遍历，目录项类型来自缓存，无需再逐个 stat。
+
+    Args:
+        directory: 数据目录
+
+    Returns:
+        List[str]: 排序后的文件路径列表，目录不存在时返回空列表
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return sorted(
+                entry.path for entry in entries
+                if entry.name.endswith('.out') and not entry.name.startswith('.') and entry.is_file()
+            )
+    except FileNotFoundError:
+        return []
+
+
+def _analyze_ping_file(file_path: str, min_duration: float, keep_outage_details: bool = True,
+                       capture_output: bool = True) -> Tuple[bool, str, Dict, List[Dict], int]:
+    """
+    分析单个ping文件（模块级函数，供 analyze_all_files 在进程池中调用）
+
+    Args:
+        file_path: ping数据文件路径
+        min_duration: 最小中断时长（秒）
+        keep_outage_details: 是否保留中断详情
+        capture_output: 是否收集打印内容（仅用于子进程；redirect_stdout 会替换全局 sys.stdout，
+            在多线程的调用方中不安全）
+
+    Returns:
+        Tuple: (是否解析成功, 收集到的打印输出（不收集时为空串）, 统计信息, 中断列表, 数据点数量)
+    """
+    # 创建新的分析器实例处理单个文件，打印内容收集后交由调用方按文件顺序输出
+    analyzer = PingAnalyzer()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output) if capture_output else contextlib.nullcontext():
+        print(f"\n{'='*60}")
+        print(f"分析文件: {os.path.basename(file_path)}")
+        print(f"{'='*60}")
+        parsed = analyzer.parse_file(file_path)
+        if parsed:
+            analyzer.analyze_outages(min_duration, keep_outage_details)
+            analyzer.print_summary()
+    return parsed, output.getvalue(), analyzer.stats, analyzer.outages, len(analyzer.data_points)
+
+
 def analyze_labbook_output(output_dir: str) -> dict:
     """
     分析 labbook 输出结果
@@ -1204,12 +1394,14 @@ def analyze_labbook_output(output_dir: str) -> dict:
         # 检查节点配置
         nodes_dir = os.path.join(network_dir, 'nodes')
         if os.path.exists(nodes_dir):
-            nodes_count = len([f for f in os.listdir(nodes_dir) if os.path.isdir(os.path.join(nodes_dir, f))])
+            with os.scandir(nodes_dir) as entries:
+                nodes_count = sum(1 for entry in entries if entry.is_dir())
         
         # 检查链路配置
         links_dir = os.path.join(network_dir, 'links')
         if os.path.exists(links_dir):
-            links_count = len([f for f in os.listdir(links_dir) if f.endswith('.json')])
+            with os.scandir(links_dir) as entries:
+                links_count = sum(1 for entry in entries if entry.name.endswith('.json'))
         
         # 检查时间线文件
         timeline_file = os.path.join(output_dir, 'timeline.json')
@@ -1217,11 +1409,13 @@ def analyze_labbook_output(output_dir: str) -> dict:
         
         # 检查ping结果文件并进行分析
         ping_results = {}
-        ping_files = glob.glob(os.path.join(output_dir, "*.out"))
+        ping_files = _find_ping_files(output_dir)
         
         if ping_files:
             analyzer = PingAnalyzer(output_dir)
-            batch_results = analyzer.analyze_all_files()
+            # 这里只使用汇总统计，不保留每次中断的详情；
+            # 本函数在 LabGrid 工作线程中调用，顺序分析，不在多线程进程中再启动进程池
+            batch_results = analyzer.analyze_all_files(workers=1, files=ping_files, keep_outage_details=False)
             if batch_results:
                 summary = batch_results.get('_summary', {})
                 ping_results = {
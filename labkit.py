@@ -5,12 +5,20 @@ Labkit CLI 入口脚本 (Python 版)
     python labkit.py cli <labkit命令参数>
 """
 import sys
-import subprocess
 
 def cli_main(args):
-    # 直接调用 labkit.cli.main 模块
-    cmd = [sys.executable, "-m", "labkit.cli.main"] + args
-    subprocess.run(cmd)
+    # 在当前进程内直接调用 labkit.cli.main，省去再启动一个 Python 解释器的开销
+    try:
+        from labkit.cli.main import app
+    except ModuleNotFoundError as e:
+        # CLI 内部的导入错误（如缺少 typer）原样抛出；找不到 labkit 包本身时给出明确提示
+        if (e.name or "").split(".")[0] != "labkit":
+            raise
+        raise ModuleNotFoundError(
+            "找不到 labkit 包，请在项目根目录下运行本脚本或先安装 labkit (pip install -e .)",
+            name=e.name,
+        ) from e
+    app(args=args)
 
 def print_help():
     print("Labkit CLI 脚本用法：")
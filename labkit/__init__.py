@@ -5,7 +5,7 @@ This package provides a complete Python SDK for creating and managing
 Labbook network experiment specifications.
 """
 
-from .models import *
+import importlib
 
 
 __version__ = "0.1.0"
@@ -25,3 +25,24 @@ __all__ = [
     "ConditionType",
     "LabbookGenerator",
 ]
+
+
+def __getattr__(name):
+    """
+    按需加载模型（PEP 562）
+
+    import labkit 或其子包（cli、labgrid 等）时不再加载全部 pydantic 模型，
+    首次访问 labkit.Node 等名称时才导入 labkit.models。
+    """
+    if not name.startswith("__"):
+        models = importlib.import_module(".models", __name__)
+        if name in models.__all__:
+            value = getattr(models, name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    models = importlib.import_module(".models", __name__)
+    return sorted(set(globals()) | set(models.__all__))
@@ -1,6 +1,12 @@
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 import yaml
+from pydantic import TypeAdapter
 
 '''
 [experiment-name]/
@@ -16,6 +22,7 @@ import yaml
 └── actions/                # [必需] 动作定义库
 '''
 
+from labkit.models.base import BaseLabbookModel
 from labkit.models.labbook import Labbook
 from labkit.models.network import NetworkConfig, Node, L2Switch, Link, Image
 from labkit.models.playbook import Playbook, TimelineItem
@@ -26,6 +33,62 @@ from labkit.models.events import (
     LinkPropertiesMode, NodeExecArgs, VolFetchEvent, VolFetchEntry
 )
 
+# 优先使用 libyaml 的 C 实现，缺失时回退到纯 Python 实现
+try:
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+    logging.getLogger(__name__).warning("libyaml 不可用，YAML 输出将使用纯 Python 的 SafeDumper")
+
+
+class _ModelDumper(_YamlDumper):
+    """直接遍历模型字段输出 YAML，省去 model_dump 生成的整棵中间字典"""
+
+    def ignore_aliases(self, data: Any) -> bool:
+        # model_dump 每次生成新对象，从不产生锚点；共享的模型实例同样按原样展开
+        return True
+
+
+def _represent_model(dumper: _ModelDumper, model: BaseLabbookModel) -> yaml.Node:
+    """按字段顺序输出模型，等价于 model_dump(by_alias=True, exclude_none=True)"""
+    values = model.__dict__
+    return dumper.represent_mapping("tag:yaml.org,2002:map", [
+        (field.alias or name, values[name])
+        for name, field in type(model).model_fields.items()
+        if values[name] is not None
+    ])
+
+
+_ModelDumper.add_multi_representer(BaseLabbookModel, _represent_model)
+
+# 事件条数达到该值时改用 pydantic 的 Rust 序列化器输出 JSON（JSON 是 YAML 的子集，
+# 文件名与 source 保持 .yaml 不变，下游按 YAML 解析结果完全一致）
+_JSON_EVENTS_MIN_COUNT = 500
+_NETWORK_EVENTS_ADAPTER = TypeAdapter(List[NetworkEvent])
+_NETFUNC_EVENTS_ADAPTER = TypeAdapter(List[NetFuncEvent])
+
+
+def _dump_events(events: List[BaseLabbookModel], adapter: TypeAdapter) -> bytes:
+    """序列化事件列表，大批量时输出 JSON 以避免逐节点构造 YAML 的开销"""
+    if len(events) >= _JSON_EVENTS_MIN_COUNT:
+        return adapter.dump_json(events, by_alias=True, exclude_none=True) + b"\n"
+    return yaml.dump(events, Dumper=_ModelDumper, allow_unicode=True, sort_keys=False).encode("utf-8")
+
+# 输出缓存版本（输出格式变化时递增，使旧缓存失效）
+_OUTPUT_CACHE_VERSION = 2
+
+
+def _output_cache_dir() -> Path:
+    """输出缓存目录：放在用户缓存目录而非输出目录，避免随 labbook 一起被上传"""
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "labkit" / "builder"
+
+# 输出文件的打开标志（Windows 下需要显式指定二进制模式）
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+# 一批文件数达到该值时改用线程池并行写入（文件 I/O 期间会释放 GIL）
+_PARALLEL_WRITE_MIN_FILES = 8
+_MAX_WRITE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 # =========================
 # 统一的实验构建器
 # =========================
@@ -42,13 +105,15 @@ class LabbookBuilder:
     - validate_*: 验证配置
     """
 
-    def __init__(self, output_dir: str = ".", name: str = "experiment"):
+    def __init__(self, output_dir: str = ".", name: str = "experiment", output_cache: bool = False):
         """
         初始化 LabbookBuilder
         
         Args:
             output_dir (str): 输出目录
             name (str): 实验名称
+            output_cache (bool): 是否启用输出缓存；启用后在用户缓存目录记录上次输出，
+                内容未变且文件未被改动时跳过 labbook/config/playbook 的写入
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -60,18 +125,56 @@ class LabbookBuilder:
         self.tags = []
         self.labbook: Optional[Labbook] = None
         
-        # 网络组件
-        self.images = []
-        self.nodes = []
-        self.switches = []
-        self.links = []
+        # 网络组件（只能通过 add_* 添加，对外以只读元组暴露，保证下面的索引始终与之一致）
+        self._images: List[Image] = []
+        self._images_by_key: Dict[Tuple[Any, ...], Image] = {}
+        self._nodes: List[Node] = []
+        self._switches: List[L2Switch] = []
+        self._links: List[Link] = []
+        
+        # 端点 / 交换机 / 镜像索引，add_* 时增量维护，使引用检查为 O(1)
+        self._endpoint_set: set[str] = set()
+        self._switch_ids: set[str] = set()
+        self._image_keys: set[str] = set()
         
         # 流程编排
         self.actions = {}
         self.timeline = []
+        # 待写入的动作文件（source 相对路径 -> 内容），在 _write_output 中一次性批量写出
+        self._pending_action_writes: Dict[str, bytes] = {}
         
         # 验证错误
         self._validation_errors = []
+        
+        # 已创建的输出目录，避免重复 mkdir
+        self._created_dirs = {self.output_dir}
+        
+        # 输出缓存文件（未启用时为 None），按输出目录的绝对路径区分
+        self._output_cache_file: Optional[Path] = None
+        if output_cache:
+            output_dir_digest = hashlib.blake2b(str(self.output_dir.resolve()).encode("utf-8"), digest_size=16).hexdigest()
+            self._output_cache_file = _output_cache_dir() / f"{output_dir_digest}.json"
+
+    # ===== 只读组件视图 =====
+    @property
+    def images(self) -> Tuple[Image, ...]:
+        """已添加的镜像（只读，通过 add_image 添加）"""
+        return tuple(self._images)
+    
+    @property
+    def nodes(self) -> Tuple[Node, ...]:
+        """已添加的节点（只读，通过 add_node 添加）"""
+        return tuple(self._nodes)
+    
+    @property
+    def switches(self) -> Tuple[L2Switch, ...]:
+        """已添加的交换机（只读，通过 add_switch 添加）"""
+        return tuple(self._switches)
+    
+    @property
+    def links(self) -> Tuple[Link, ...]:
+        """已添加的链路（只读，通过 add_link 添加）"""
+        return tuple(self._links)
 
     # ===== 配置类方法 (set_*) =====
     def set_name(self, name: str) -> 'LabbookBuilder':
@@ -100,58 +203,65 @@ class LabbookBuilder:
         return self
 
     # ===== 添加组件方法 (add_*) =====
-    def add_image(self, repo: str, tag: str = "latest") -> 'LabbookBuilder':
-        """添加容器镜像"""
-        image = Image(repo=repo, tag=tag)
-        self.images.append(image)
+    def add_image(self, image: Image) -> 'LabbookBuilder':
+        """添加容器镜像，相同的镜像只保留一份"""
+        key = (image.type_, image.repo, image.tag, image.url, image.archive_path)
+        if key not in self._images_by_key:
+            self._images_by_key[key] = image
+            self._images.append(image)
+        self._image_keys.add(f"{image.repo}:{image.tag}")
         return self
     
     def add_node(self, node: Node) -> 'LabbookBuilder':
         """添加网络节点"""
         # 检查 node 的 image 是否存在于 images 中
         node_image_str = node.get_image_str()
-        if not any(f"{img.repo}:{img.tag}" == node_image_str for img in self.images):
+        if node_image_str not in self._image_keys:
             raise ValueError(f"Node '{node.name}' references image '{node_image_str}', but it does not exist in images.")
         
-        # 添加 interfaces 的 endpoint 到 endpoint_map 中
-        for interface in node.interfaces:
-            endpoint = f"{node.name}:{interface.name}"
-            # 检查 endpoint 是否已存在
-            for existing_node in self.nodes:
-                for existing_interface in existing_node.interfaces:
-                    if f"{existing_node.name}:{existing_interface.name}" == endpoint:
-                        raise ValueError(f"Endpoint '{endpoint}' already exists.")
+        # 检查 interfaces 的 endpoint 是否已被已有节点占用
+        endpoints = [f"{node.name}:{interface.name}" for interface in node.interfaces]
+        endpoint_set = self._endpoint_set
+        for endpoint in endpoints:
+            if endpoint in endpoint_set:
+                raise ValueError(f"Endpoint '{endpoint}' already exists.")
         
-        self.nodes.append(node)
+        endpoint_set.update(endpoints)
+        self._nodes.append(node)
+        return self
+    
+    def add_nodes(self, nodes: Iterable[Node]) -> 'LabbookBuilder':
+        """批量添加网络节点（逐个校验，可直接传入生成器或 itertools.chain）"""
+        add_node = self.add_node
+        for node in nodes:
+            add_node(node)
         return self
     
     def add_switch(self, switch: L2Switch) -> 'LabbookBuilder':
         """添加交换机"""
-        self.switches.append(switch)
+        self._switches.append(switch)
+        self._switch_ids.add(switch.id)
         return self
     
     def add_link(self, link: Link) -> 'LabbookBuilder':
         """添加网络链路"""
         # 判断 link 的 endpoint 是否存在
         for endpoint in link.endpoints:
-            endpoint_exists = False
-            for node in self.nodes:
-                for interface in node.interfaces:
-                    if f"{node.name}:{interface.name}" == endpoint:
-                        endpoint_exists = True
-                        break
-                if endpoint_exists:
-                    break
-            
-            if not endpoint_exists:
+            if endpoint not in self._endpoint_set:
                 raise ValueError(f"Link '{link.id}' references endpoint '{endpoint}', but it does not exist.")
         
         # 如果 link.switch 非空，则检查 switch 是否存在于 switches 中
-        if link.switch:
-            if not any(sw.id == link.switch for sw in self.switches):
-                raise ValueError(f"Link '{link.id}' references switch '{link.switch}', but it does not exist.")
+        if link.switch and link.switch not in self._switch_ids:
+            raise ValueError(f"Link '{link.id}' references switch '{link.switch}', but it does not exist.")
         
-        self.links.append(link)
+        self._links.append(link)
+        return self
+    
+    def add_links(self, links: Iterable[Link]) -> 'LabbookBuilder':
+        """批量添加网络链路（逐个校验，可直接传入生成器或 itertools.chain）"""
+        add_link = self.add_link
+        for link in links:
+            add_link(link)
         return self
     
     def add_timeline_item(self, at: int, description: str, action: Action) -> 'LabbookBuilder':
@@ -274,79 +384,31 @@ class LabbookBuilder:
     # ===== 创建动作方法 (create_*) =====
     def create_network_events_action(self, events: List[NetworkEvent], name: str) -> Action:
         """创建网络事件动作"""
-        # 1. 创建 actions 目录
-        actions_dir = self.output_dir / "actions"
-        actions_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 2. 转为 dict
-        events_dicts = [e.model_dump(by_alias=True, exclude_none=True) for e in events]
-        # 3. 转为 YAML
-        yaml_str = yaml.dump(events_dicts, allow_unicode=True, sort_keys=False)
-        # 4. 写入文件
-        event_file = actions_dir / f"{name}.yaml"
-        with open(event_file, "w", encoding="utf-8") as f:
-            f.write(yaml_str)
-        # 5. 添加动作
-        source = f"actions/{name}.yaml"
-        action = self.new_action(ActionType.NETWORK_EVENTS, source)
-        return action
+        # 1. 转为 YAML（大批量时为 JSON 形式的 YAML）
+        content = _dump_events(events, _NETWORK_EVENTS_ADAPTER)
+        # 2. 登记待写入文件（build 时批量写出）并添加动作
+        return self._new_action_internal(ActionType.NETWORK_EVENTS, name, content)
     
     def create_netfunc_events_action(self, events: List[NetFuncEvent], name: str) -> Action:
         """创建网络函数事件动作"""
-        # 1. 创建 actions 目录
-        actions_dir = self.output_dir / "actions"
-        actions_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 2. 转为 dict
-        events_dicts = [e.model_dump(by_alias=True, exclude_none=True) for e in events]
-        # 3. 转为 YAML
-        yaml_str = yaml.dump(events_dicts, allow_unicode=True, sort_keys=False)
-        # 4. 写入文件
-        event_file = actions_dir / f"{name}.yaml"
-        with open(event_file, "w", encoding="utf-8") as f:
-            f.write(yaml_str)
-        # 5. 添加动作
-        source = f"actions/{name}.yaml"
-        action = self.new_action(ActionType.NETFUNC_EVENTS, source)
-        return action
+        # 1. 转为 YAML（大批量时为 JSON 形式的 YAML）
+        content = _dump_events(events, _NETFUNC_EVENTS_ADAPTER)
+        # 2. 登记待写入文件（build 时批量写出）并添加动作
+        return self._new_action_internal(ActionType.NETFUNC_EVENTS, name, content)
     
     def create_netfunc_exec_output_event_action(self, event: NetFuncExecOutputEvent, name: str) -> Action:
         """创建网络函数执行输出事件动作"""
-        # 1. 创建 actions 目录
-        actions_dir = self.output_dir / "actions"
-        actions_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 2. 转为 dict
-        event_dict = event.model_dump(by_alias=True, exclude_none=True)
-        # 3. 转为 YAML
-        yaml_str = yaml.dump(event_dict, allow_unicode=True, sort_keys=False)
-        # 4. 写入文件
-        event_file = actions_dir / f"{name}.yaml"
-        with open(event_file, "w", encoding="utf-8") as f:
-            f.write(yaml_str)
-        # 5. 添加动作
-        source = f"actions/{name}.yaml"
-        action = self.new_action(ActionType.NETFUNC_EXEC_OUTPUT, source)
-        return action
+        # 1. 转为 YAML
+        yaml_str = yaml.dump(event, Dumper=_ModelDumper, allow_unicode=True, sort_keys=False)
+        # 2. 登记待写入文件（build 时批量写出）并添加动作
+        return self._new_action_internal(ActionType.NETFUNC_EXEC_OUTPUT, name, yaml_str.encode("utf-8"))
     
     def create_vol_fetch_event_action(self, event: VolFetchEvent, name: str) -> Action:
         """创建卷获取事件动作"""
-        # 1. 创建 actions 目录
-        actions_dir = self.output_dir / "actions"
-        actions_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 2. 转为 dict
-        event_dict = event.model_dump(by_alias=True, exclude_none=True)
-        # 3. 转为 YAML
-        yaml_str = yaml.dump(event_dict, allow_unicode=True, sort_keys=False)
-        # 4. 写入文件
-        event_file = actions_dir / f"{name}.yaml"
-        with open(event_file, "w", encoding="utf-8") as f:
-            f.write(yaml_str)
-        # 5. 添加动作
-        source = f"actions/{name}.yaml"
-        action = self.new_action(ActionType.VOL_FETCH, source)
-        return action
+        # 1. 转为 YAML
+        yaml_str = yaml.dump(event, Dumper=_ModelDumper, allow_unicode=True, sort_keys=False)
+        # 2. 登记待写入文件（build 时批量写出）并添加动作
+        return self._new_action_internal(ActionType.VOL_FETCH, name, yaml_str.encode("utf-8"))
     
     def new_action(
         self,
@@ -356,47 +418,50 @@ class LabbookBuilder:
     ) -> Action:
         """创建新动作"""
         # 判断 source 是否是一个合法的相对路径
-        source_path = Path(source)
-        if source_path.is_absolute() or ".." in source_path.parts or source_path.parts[0] in ("", "/"):
-            raise ValueError(f"source '{source}' 必须是合法的相对路径，且不能包含上级目录引用")
+        _check_action_source(source)
         
-        # 创建文件（如果不存在则创建空文件，包含父目录）
-        full_path = self.output_dir / source_path
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        if not full_path.exists():
-            full_path.touch()
+        # 创建文件（如果不存在则创建空文件，包含父目录）；已登记待写入的文件由 build 统一写出
+        if source not in self._pending_action_writes:
+            full_path = self.output_dir / source
+            self._ensure_dir(full_path.parent)
+            if not full_path.exists():
+                full_path.touch()
         
         action = Action.template(type_, source, with_)
         self.actions[source] = action
         return action
 
+    def _new_action_internal(self, type_: ActionType, name: str, content: bytes) -> Action:
+        """create_* 共用：登记 actions/{name}.yaml 的待写入内容并创建动作，不预先创建空文件"""
+        source = f"actions/{name}.yaml"
+        _check_action_source(source)
+        self._pending_action_writes[source] = content
+        action = Action.template(type_, source)
+        self.actions[source] = action
+        return action
+
     # ===== 验证方法 (validate_*) =====
     def validate_network(self) -> bool:
         """验证网络配置"""
         self._validation_errors = []
         
         # 验证节点镜像引用
-        image_map = {f"{img.repo}:{img.tag}": img for img in self.images}
-        for node in self.nodes:
-            if node.get_image_str() not in image_map:
+        image_keys = self._image_keys
+        for node in self._nodes:
+            if node.get_image_str() not in image_keys:
                 self._validation_errors.append(f"Node '{node.name}' references non-existent image '{node.get_image_str()}'")
         
         # 验证链路端点引用
-        endpoint_map = {}
-        for node in self.nodes:
-            for interface in node.interfaces:
-                endpoint = f"{node.name}:{interface.name}"
-                endpoint_map[endpoint] = True
-        
-        for link in self.links:
+        endpoint_set = self._endpoint_set
+        for link in self._links:
             for endpoint in link.endpoints:
-                if endpoint not in endpoint_map:
+                if endpoint not in endpoint_set:
                     self._validation_errors.append(f"Link '{link.id}' references non-existent endpoint '{endpoint}'")
         
         # 验证链路交换机引用
-        switch_map = {sw.id: sw for sw in self.switches}
-        for link in self.links:
-            if link.switch and link.switch not in switch_map:
+        switch_ids = self._switch_ids
+        for link in self._links:
+            if link.switch and link.switch not in switch_ids:
                 self._validation_errors.append(f"Link '{link.id}' references non-existent switch '{link.switch}'")
         
         return len(self._validation_errors) == 0
@@ -405,8 +470,8 @@ class LabbookBuilder:
         """验证流程编排"""
         # 验证时间线动作引用
         for item in self.timeline:
-            if item.action not in self.actions:
-                self._validation_errors.append(f"Timeline item references non-existent action '{item.action}'")
+            if item.action.source not in self.actions:
+                self._validation_errors.append(f"Timeline item references non-existent action '{item.action.source}'")
         
         return len(self._validation_errors) == 0
     
@@ -422,10 +487,10 @@ class LabbookBuilder:
     def build_network_config(self) -> NetworkConfig:
         """构建网络配置"""
         return NetworkConfig(
-            nodes=self.nodes,
-            switches=self.switches,
-            links=self.links,
-            images=self.images
+            nodes=self._nodes,
+            switches=self._switches,
+            links=self._links,
+            images=self._images
         )
     
     def build_playbook(self) -> Playbook:
@@ -460,42 +525,139 @@ class LabbookBuilder:
     
     def _write_output(self, network_config: NetworkConfig, playbook: Playbook, labbook: Labbook):
         """写入输出文件"""
-        # 1. labbook.yaml
-        labbook_yaml = self.output_dir / "labbook.yaml"
-        labbook_dict = labbook.model_dump(by_alias=True, exclude_none=True)
-        yaml_str = yaml.dump(labbook_dict, sort_keys=False, allow_unicode=True)
-        with open(labbook_yaml, "w", encoding="utf-8") as f:
-            f.write(yaml_str)
-        
-        # 2. network/config.yaml
         network_dir = self.output_dir / "network"
-        network_dir.mkdir(exist_ok=True)
-        network_config_yaml = network_dir / "config.yaml"
-        network_config_dict = network_config.model_dump(by_alias=True, exclude_none=True)
-        with open(network_config_yaml, "w", encoding="utf-8") as f:
-            f.write(yaml.dump(network_config_dict, sort_keys=False, allow_unicode=True))
         
-        # 3. 创建 network/mounts/ 目录
+        # 0. 批量写出 create_*_action 登记的动作文件
+        if self._pending_action_writes:
+            output_dir = self.output_dir
+            self._write_files([(output_dir / source, data) for source, data in self._pending_action_writes.items()])
+            self._pending_action_writes.clear()
+        
+        # 1. labbook.yaml  2. network/config.yaml  3. playbook.yaml
+        outputs = [
+            (self.output_dir / "labbook.yaml", labbook),
+            (network_dir / "config.yaml", network_config),
+            (self.output_dir / "playbook.yaml", playbook),
+        ]
+        if self._output_cache_file is None:
+            # 直接流式写入文件，不在内存中保留完整的 YAML 字符串及其编码副本
+            for path, model in outputs:
+                self._dump_yaml_file(path, model)
+        else:
+            # 同一份 YAML 字节既用于计算缓存键又用于写入；内容未变且文件未被改动时跳过写入
+            files = [
+                (path, yaml.dump(model, Dumper=_ModelDumper, sort_keys=False, allow_unicode=True, encoding="utf-8"))
+                for path, model in outputs
+            ]
+            cache_key = self._output_cache_key(files)
+            if not self._output_cache_hit(cache_key):
+                self._write_files(files)
+                self._save_output_cache(cache_key, [path for path, _ in files])
+        
+        # 4. 创建 network/mounts/ 目录
         mounts_dir = network_dir / "mounts"
-        mounts_dir.mkdir(exist_ok=True, parents=True)
+        self._ensure_dir(mounts_dir)
         
-        # 4. 为节点的 volumes 创建挂载点目录
-        for node in self.nodes:
+        # 5. 为节点的 volumes 创建挂载点目录
+        for node in self._nodes:
             if node.volumes:
                 for volume in node.volumes:
-                    host_path_dir = mounts_dir / volume.host_path
-                    host_path_dir.mkdir(exist_ok=True, parents=True)
-        
-        # 5. playbook.yaml
-        playbook_yaml = self.output_dir / "playbook.yaml"
-        playbook_dict = playbook.model_dump(by_alias=True, exclude_none=True)
-        yaml_str = yaml.dump(playbook_dict, sort_keys=False, allow_unicode=True)
-        with open(playbook_yaml, "w", encoding="utf-8") as f:
-            f.write(yaml_str)
+                    self._ensure_dir(mounts_dir / volume.host_path)
         
         # 6. 创建 actions/ 目录
-        actions_dir = self.output_dir / "actions"
-        actions_dir.mkdir(exist_ok=True, parents=True)
+        self._ensure_dir(self.output_dir / "actions")
+    
+    def _output_cache_key(self, files: List[Tuple[Path, bytes]]) -> str:
+        """根据待写入的文件路径及内容计算输出缓存键"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(str(_OUTPUT_CACHE_VERSION).encode())
+        for path, data in files:
+            h.update(path.relative_to(self.output_dir).as_posix().encode("utf-8"))
+            h.update(len(data).to_bytes(8, "little"))
+            h.update(data)
+        return h.hexdigest()
+    
+    def _output_cache_hit(self, cache_key: str) -> bool:
+        """缓存键一致且记录的输出文件均未变化（大小与 mtime 相同）时命中"""
+        try:
+            with open(self._output_cache_file, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cache.get("version") != _OUTPUT_CACHE_VERSION or cache.get("key") != cache_key:
+            return False
+        for rel_path, (size, mtime_ns) in cache.get("files", {}).items():
+            try:
+                st = os.stat(self.output_dir / rel_path)
+            except OSError:
+                return False
+            if st.st_size != size or st.st_mtime_ns != mtime_ns:
+                return False
+        return True
+    
+    def _save_output_cache(self, cache_key: str, paths: List[Path]) -> None:
+        """记录本次输出的缓存键及各文件的大小与 mtime"""
+        entries = {}
+        for path in paths:
+            st = os.stat(path)
+            entries[path.relative_to(self.output_dir).as_posix()] = [st.st_size, st.st_mtime_ns]
+        cache = {"version": _OUTPUT_CACHE_VERSION, "key": cache_key, "files": entries}
+        try:
+            self._write_files([(self._output_cache_file, json.dumps(cache, indent=2).encode("utf-8"))])
+        except OSError as e:
+            # 缓存只用于跳过重复写入，写不了不影响构建结果
+            logging.getLogger(__name__).warning(f"无法写入输出缓存 {self._output_cache_file}: {e}")
+    
+    def _dump_yaml_file(self, path: Path, model: BaseLabbookModel) -> None:
+        """将模型以 UTF-8 YAML 流式写入文件"""
+        self._ensure_dir(path.parent)
+        with open(path, "wb") as f:
+            yaml.dump(model, f, Dumper=_ModelDumper, sort_keys=False, allow_unicode=True, encoding="utf-8")
+    
+    def _ensure_dir(self, path: Path) -> None:
+        """创建目录，同一目录在构建器生命周期内只创建一次"""
+        if path not in self._created_dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(path)
+    
+    def _write_files(self, files: List[Tuple[Path, bytes]]) -> None:
+        """
+        批量写入文件
+        
+        先在当前线程对所有父目录去重创建（避免并发 mkdir），再写入各文件；
+        文件较多时由线程池并行写入。
+        
+        Args:
+            files: (文件路径, 文件内容) 列表
+        """
+        for path, _ in files:
+            self._ensure_dir(path.parent)
+        if len(files) < _PARALLEL_WRITE_MIN_FILES:
+            for path, data in files:
+                _write_file(path, data)
+            return
+        with ThreadPoolExecutor(max_workers=min(_MAX_WRITE_WORKERS, len(files))) as executor:
+            # 消费结果以便传播写入异常
+            for _ in executor.map(lambda item: _write_file(*item), files):
+                pass
+
+
+def _check_action_source(source: str) -> None:
+    """检查 source 是否为合法的相对路径（纯字符串检查，避免每个动作构造 Path）"""
+    if (not source or source[0] in "/\\" or os.path.isabs(source)
+            or ".." in source.replace("\\", "/").split("/")):
+        raise ValueError(f"source '{source}' 必须是合法的相对路径，且不能包含上级目录引用")
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    """以无缓冲方式一次性写入文件内容，避免文本模式下的编码与缓冲开销"""
+    fd = os.open(path, _WRITE_FLAGS, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 # =========================
 # 向后兼容的别名
@@ -9,7 +9,7 @@ import os
 import time
 import logging
 import threading
-from typing import Dict, List, Optional, Any, Union
+from typing import Callable, Dict, List, Optional, Any, Union
 from datetime import datetime
 from pathlib import Path
 
@@ -24,7 +24,7 @@ from .config import ConfigManager
 from .labx import LabX
 from .experiment import Lab
 from .registry import ExperimentRegistry
-from .task_manager import TaskManager
+from .task_manager import Task, TaskManager
 from .resource_manager import ResourceManager
 from .result_manager import ResultManager
 
@@ -211,7 +211,9 @@ class LabGrid:
         """执行单个任务"""
         try:
             # 分配服务器
-            server_name = self.resource_manager.allocate_server(task.config.priority)
+            server_name = self.resource_manager.allocate_server(
+                task.config.priority, task.config.preferred_server
+            )
             if not server_name:
                 self.task_manager.fail_task(task.task_id, "无法分配服务器")
                 return
@@ -287,13 +289,15 @@ class LabGrid:
         """
         self.registry.register(experiment_type, experiment_class, description, tags)
     
-    def run_experiment(self, experiment_type: str, config: ExperimentConfig) -> str:
+    def run_experiment(self, experiment_type: str, config: ExperimentConfig,
+                       callback: Optional[Callable[[Task], None]] = None) -> str:
         """
         运行单个实验
         
         Args:
             experiment_type: 实验类型
             config: 实验配置
+            callback: 任务结束（完成或最终失败）时在工作线程中调用的回调
             
         Returns:
             任务ID
@@ -311,7 +315,8 @@ class LabGrid:
             experiment_type=experiment_type,
             config=config,
             priority=config.priority,
-            max_retries=config.retry_count
+            max_retries=config.retry_count,
+            callback=callback
         )
         
         # 提交任务
@@ -321,12 +326,14 @@ class LabGrid:
         self.logger.info(f"📋 提交实验任务: {task_id} ({experiment_type})")
         return task_id
     
-    def run_batch_experiments(self, experiments: List[tuple]) -> List[str]:
+    def run_batch_experiments(self, experiments: List[tuple],
+                              callback: Optional[Callable[[Task], None]] = None) -> List[str]:
         """
         批量运行多个实验
         
         Args:
             experiments: 实验列表，每个元素是 (experiment_type, config) 元组
+            callback: 每个任务结束（完成或最终失败）时在工作线程中调用的回调
             
         Returns:
             任务ID列表
@@ -335,7 +342,7 @@ class LabGrid:
         
         for experiment_type, config in experiments:
             try:
-                task_id = self.run_experiment(experiment_type, config)
+                task_id = self.run_experiment(experiment_type, config, callback=callback)
                 task_ids.append(task_id)
             except Exception as e:
                 self.logger.error(f"❌ 提交实验失败: {experiment_type}, 错误: {e}")
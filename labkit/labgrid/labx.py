@@ -6,9 +6,16 @@ LabGrid 服务器能力封装 (LabX)
 """
 
 import os
+import posixpath
+import shlex
+import shutil
 import logging
+import subprocess
+import tempfile
+import threading
 import time
-from typing import Dict, List, Optional, Any, Union
+import weakref
+from typing import Dict, List, Optional, Any, Tuple, Union
 from pathlib import Path
 from datetime import datetime
 
@@ -16,6 +23,23 @@ from .types import ServerConfig, ServerStatus, ServerInfo
 from labkit.remote import RemoteManager
 
 
+def _close_ssh_masters(control_dir: str, exit_commands: Dict[Tuple[str, str, int], List[str]]):
+    """
+    结束已打开的 OpenSSH ControlMaster 并删除控制套接字目录
+    
+    Args:
+        control_dir: 控制套接字目录
+        exit_commands: 各服务器结束 ControlMaster 的 ssh 命令
+    """
+    for cmd in exit_commands.values():
+        try:
+            subprocess.run(cmd, capture_output=True, timeout=10)
+        except Exception:
+            pass
+    exit_commands.clear()
+    shutil.rmtree(control_dir, ignore_errors=True)
+
+
 class LabX:
     """
     服务器能力封装类
@@ -40,6 +64,16 @@ class LabX:
         self.server_connections: Dict[str, bool] = {}
         self.server_info: Dict[str, ServerInfo] = {}
         
+        # 每台服务器复用一个 paramiko 连接；rsync 通过 OpenSSH ControlMaster 复用同一条 SSH 会话
+        self._ssh_clients: Dict[str, Any] = {}
+        self._ssh_lock = threading.Lock()
+        # 控制套接字目录在首次使用 OpenSSH 时才创建；只对实际用过的服务器执行 -O exit，
+        # 未调用 close() 时由 finalizer 在对象回收或解释器退出时清理
+        self._ssh_control_lock = threading.Lock()
+        self._ssh_control_dir: Optional[str] = None
+        self._ssh_master_exits: Dict[Tuple[str, str, int], List[str]] = {}
+        self._ssh_finalizer: Optional[weakref.finalize] = None
+        
         # 初始化服务器信息
         self._init_server_info()
         
@@ -172,45 +206,23 @@ class LabX:
             命令执行结果字典
         """
         try:
-            import paramiko
-            
-            # 获取服务器配置
-            server_config = self.servers_config.get(server_name)
-            if not server_config:
+            ssh = self._get_ssh_client(server_name, timeout)
+            if ssh is None:
                 return {'success': False, 'error': '服务器配置不存在'}
             
-            # 创建 SSH 客户端
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # 连接参数
-            connect_kwargs = {
-                'hostname': server_config.host,
-                'port': server_config.port,
-                'username': server_config.user,
-                'timeout': timeout or 30
-            }
-            
-            # 如果有私钥文件，使用私钥认证
-            if server_config.key_filename:
-                connect_kwargs['key_filename'] = server_config.key_filename
-            elif server_config.password:
-                connect_kwargs['password'] = server_config.password
-            
-            # 连接到服务器
-            ssh.connect(**connect_kwargs)
-            
             # 执行命令
-            stdin, stdout, stderr = ssh.exec_command(command, timeout=timeout or 30)
+            try:
+                stdin, stdout, stderr = ssh.exec_command(command, timeout=timeout or 30)
+            except Exception:
+                # 连接已失效，丢弃后由下次调用重新建立
+                self._drop_ssh_client(server_name)
+                raise
             
             # 获取输出
             stdout_str = stdout.read().decode('utf-8').strip()
             stderr_str = stderr.read().decode('utf-8').strip()
             exit_code = stdout.channel.recv_exit_status()
             
-            # 关闭连接
-            ssh.close()
-            
             # 返回结果
             result = {
                 'success': exit_code == 0,
@@ -233,6 +245,92 @@ class LabX:
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    def _get_ssh_client(self, server_name: str, timeout: Optional[int] = None):
+        """
+        获取指定服务器的 paramiko 连接，已建立且仍可用的连接直接复用
+        
+        Args:
+            server_name: 服务器名称
+            timeout: 建立连接的超时时间（秒）
+            
+        Returns:
+            paramiko.SSHClient，服务器配置不存在时返回 None
+        """
+        server_config = self.servers_config.get(server_name)
+        if not server_config:
+            return None
+        
+        with self._ssh_lock:
+            ssh = self._ssh_clients.get(server_name)
+            transport = ssh.get_transport() if ssh else None
+            if transport is not None and transport.is_active():
+                return ssh
+            
+            import paramiko
+            
+            # 创建 SSH 客户端
+            ssh = paramiko.SSHClient()
+            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            
+            # 连接参数
+            connect_kwargs = {
+                'hostname': server_config.host,
+                'port': server_config.port,
+                'username': server_config.user,
+                'timeout': timeout or 30
+            }
+            
+            # 如果有私钥文件，使用私钥认证
+            if server_config.key_filename:
+                connect_kwargs['key_filename'] = server_config.key_filename
+            elif server_config.password:
+                connect_kwargs['password'] = server_config.password
+            
+            # 连接到服务器
+            ssh.connect(**connect_kwargs)
+            self._ssh_clients[server_name] = ssh
+            return ssh
+    
+    def _drop_ssh_client(self, server_name: str):
+        """关闭并丢弃指定服务器的缓存连接"""
+        with self._ssh_lock:
+            ssh = self._ssh_clients.pop(server_name, None)
+        if ssh is not None:
+            try:
+                ssh.close()
+            except Exception:
+                pass
+    
+    def _ssh_options(self, server_config: ServerConfig) -> List[str]:
+        """
+        构建 OpenSSH 参数，同一服务器的多次 rsync/ssh 调用通过 ControlMaster 复用连接
+        
+        Args:
+            server_config: 服务器配置
+            
+        Returns:
+            ssh 命令参数列表（不含目标主机）
+        """
+        options = ['ssh', '-p', str(server_config.port)]
+        if server_config.key_filename:
+            options += ['-i', server_config.key_filename]
+        with self._ssh_control_lock:
+            if self._ssh_control_dir is None:
+                self._ssh_control_dir = tempfile.mkdtemp(prefix="labx-ssh-")
+                self._ssh_finalizer = weakref.finalize(
+                    self, _close_ssh_masters, self._ssh_control_dir, self._ssh_master_exits
+                )
+            options += [
+                '-o', 'StrictHostKeyChecking=no',
+                '-o', 'ControlMaster=auto',
+                '-o', f'ControlPath={self._ssh_control_dir}/%C',
+                '-o', 'ControlPersist=10m',
+            ]
+            key = (server_config.user, server_config.host, server_config.port)
+            if key not in self._ssh_master_exits:
+                self._ssh_master_exits[key] = options + ['-O', 'exit', f'{server_config.user}@{server_config.host}']
+        return options
+    
     def upload_file(self, server_name: str, local_path: str, remote_path: str) -> bool:
         """
         上传文件到指定服务器
@@ -318,16 +416,15 @@ class LabX:
             if not server_config:
                 return False
             
-            # 构建 rsync 命令
+            # 构建 rsync 命令（一次调用完成整个目录，低压缩级别减少 CPU 开销）
             rsync_cmd = [
-                'rsync', '-avz', '--delete',
-                '-e', f'ssh -p {server_config.port} -i {server_config.key_filename} -o StrictHostKeyChecking=no',
+                'rsync', '-az', '--delete', '--compress-level=1',
+                '-e', shlex.join(self._ssh_options(server_config)),
                 f'{local_dir}/',
                 f'{server_config.user}@{server_config.host}:{remote_dir}/'
             ]
             
             # 执行 rsync 命令
-            import subprocess
             result = subprocess.run(rsync_cmd, capture_output=True, text=True)
             
             if result.returncode == 0:
@@ -340,6 +437,112 @@ class LabX:
             self.logger.error(f"rsync 执行出错: {e}")
             return False
     
+    def upload_directory_tar(self, server_name: str, local_dir: str, remote_dir: str) -> bool:
+        """
+        以单个 tar 流上传目录（tar -cf - | ssh tar -xf -），适合大量小文件
+        
+        远程目录会先被清空，效果与 rsync --delete 一致。
+        
+        Args:
+            server_name: 服务器名称
+            local_dir: 本地目录路径
+            remote_dir: 远程目录路径
+            
+        Returns:
+            上传是否成功
+        """
+        server_config = self.servers_config.get(server_name)
+        if not server_config:
+            self.logger.error(f"❌ 未知服务器: {server_name}")
+            return False
+        
+        if not os.path.isdir(local_dir):
+            self.logger.error(f"❌ 本地目录不存在: {local_dir}")
+            return False
+        
+        # 远程目录会被 rm -rf 清空，拒绝空路径、根目录、家目录等危险目标
+        if posixpath.normpath(remote_dir.strip() or ".") in (".", "..", "/", "//", "~"):
+            self.logger.error(f"❌ 拒绝清空远程目录: {remote_dir!r}")
+            return False
+        
+        remote = shlex.quote(remote_dir)
+        producer = ['tar', '-cf', '-', '-C', local_dir, '.']
+        consumer = self._ssh_options(server_config) + [
+            f'{server_config.user}@{server_config.host}',
+            f'rm -rf {remote} && mkdir -p {remote} && tar -xf - -C {remote}'
+        ]
+        
+        success = self._run_tar_pipe(producer, consumer)
+        if success:
+            self.logger.debug(f"✅ 目录上传成功: {local_dir} -> {server_name}:{remote_dir}")
+        else:
+            self.logger.error(f"❌ 目录上传失败: {local_dir} -> {server_name}:{remote_dir}")
+        return success
+    
+    def download_directory_tar(self, server_name: str, remote_dir: str, local_dir: str) -> bool:
+        """
+        以单个 tar 流下载目录（ssh tar -cf - | tar -xf -），适合大量小文件
+        
+        Args:
+            server_name: 服务器名称
+            remote_dir: 远程目录路径
+            local_dir: 本地目录路径
+            
+        Returns:
+            下载是否成功
+        """
+        server_config = self.servers_config.get(server_name)
+        if not server_config:
+            self.logger.error(f"❌ 未知服务器: {server_name}")
+            return False
+        
+        os.makedirs(local_dir, exist_ok=True)
+        producer = self._ssh_options(server_config) + [
+            f'{server_config.user}@{server_config.host}',
+            f'tar -cf - -C {shlex.quote(remote_dir)} .'
+        ]
+        consumer = ['tar', '-xf', '-', '-C', local_dir]
+        
+        success = self._run_tar_pipe(producer, consumer)
+        if success:
+            self.logger.debug(f"✅ 目录下载成功: {server_name}:{remote_dir} -> {local_dir}")
+        else:
+            self.logger.error(f"❌ 目录下载失败: {server_name}:{remote_dir} -> {local_dir}")
+        return success
+    
+    def _run_tar_pipe(self, producer_cmd: List[str], consumer_cmd: List[str]) -> bool:
+        """
+        将 producer 的标准输出通过管道接到 consumer 的标准输入
+        
+        Args:
+            producer_cmd: 生成 tar 流的命令
+            consumer_cmd: 解包 tar 流的命令
+            
+        Returns:
+            两端命令是否都成功退出
+        """
+        try:
+            # producer 的 stderr 写入临时文件而非管道，避免输出过多时管道写满导致两端互相等待
+            with tempfile.TemporaryFile() as producer_stderr_file:
+                producer = subprocess.Popen(producer_cmd, stdout=subprocess.PIPE, stderr=producer_stderr_file)
+                try:
+                    consumer = subprocess.run(consumer_cmd, stdin=producer.stdout, capture_output=True)
+                finally:
+                    producer.stdout.close()
+                    producer.wait()
+                producer_stderr_file.seek(0)
+                producer_stderr = producer_stderr_file.read()
+            
+            if producer.returncode != 0 or consumer.returncode != 0:
+                stderr = (producer_stderr + consumer.stderr).decode(errors='replace')
+                self.logger.error(f"tar 传输失败: {stderr}")
+                return False
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"tar 传输出错: {e}")
+            return False
+    
     def download_file(self, server_name: str, remote_path: str, local_path: str) -> bool:
         """
         从指定服务器下载文件
@@ -391,7 +594,10 @@ class LabX:
             # 确保本地目录存在
             os.makedirs(local_dir, exist_ok=True)
             
-            success = self.remote_manager.sync_directory(server_name, remote_dir, local_dir)
+            # 优先用一次 rsync 拉取整个目录，失败时回退到逐文件下载
+            success = self._download_directory_with_rsync(server_name, remote_dir, local_dir)
+            if not success:
+                success = self.remote_manager.sync_directory(server_name, remote_dir, local_dir)
             
             if success:
                 self.logger.debug(f"✅ 目录下载成功: {server_name}:{remote_dir} -> {local_dir}")
@@ -404,6 +610,42 @@ class LabX:
             self.logger.error(f"❌ 下载目录时出错: {server_name}:{remote_dir} -> {local_dir}, 错误: {e}")
             return False
     
+    def _download_directory_with_rsync(self, server_name: str, remote_dir: str, local_dir: str) -> bool:
+        """
+        使用 rsync 命令下载目录
+        
+        Args:
+            server_name: 服务器名称
+            remote_dir: 远程目录路径
+            local_dir: 本地目录路径
+            
+        Returns:
+            下载是否成功
+        """
+        try:
+            server_config = self.servers_config.get(server_name)
+            if not server_config:
+                return False
+            
+            rsync_cmd = [
+                'rsync', '-az', '--compress-level=1',
+                '-e', shlex.join(self._ssh_options(server_config)),
+                f'{server_config.user}@{server_config.host}:{remote_dir}/',
+                f'{local_dir}/'
+            ]
+            
+            result = subprocess.run(rsync_cmd, capture_output=True, text=True)
+            
+            if result.returncode == 0:
+                return True
+            else:
+                self.logger.warning(f"rsync 下载失败，回退到逐文件下载: {result.stderr}")
+                return False
+                
+        except Exception as e:
+            self.logger.warning(f"rsync 执行出错，回退到逐文件下载: {e}")
+            return False
+    
     def sync_directory(self, server_name: str, remote_dir: str, local_dir: str) -> bool:
         """
         同步目录（下载目录的别名方法）
@@ -635,4 +877,24 @@ class LabX:
         """关闭所有连接"""
         for server_name in self.server_connections:
             self.disconnect_server(server_name)
+        
+        # 关闭复用的 paramiko 连接
+        for server_name in list(self._ssh_clients):
+            self._drop_ssh_client(server_name)
+        
+        # 结束用过的 OpenSSH ControlMaster 并清理控制套接字目录
+        with self._ssh_control_lock:
+            finalizer, self._ssh_finalizer = self._ssh_finalizer, None
+            self._ssh_control_dir = None
+        if finalizer is not None:
+            finalizer()
+        
         self.logger.info("🔌 已关闭所有服务器连接")
+    
+    def __enter__(self):
+        """进入上下文"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """退出上下文"""
+        self.close()
@@ -215,12 +215,14 @@ class ResourceManager:
                     m for m in history if m.timestamp > cutoff_time
                 ]
     
-    def allocate_server(self, task_priority: int = 0) -> Optional[str]:
+    def allocate_server(self, task_priority: int = 0,
+                        preferred_server: Optional[str] = None) -> Optional[str]:
         """
         分配服务器
         
         Args:
             task_priority: 任务优先级
+            preferred_server: 优先分配的服务器，可用时直接选用
             
         Returns:
             分配的服务器名称，如果没有可用服务器则返回 None
@@ -232,8 +234,10 @@ class ResourceManager:
                 self.logger.warning("⚠️  没有可用的服务器")
                 return None
             
-            # 根据分配策略选择服务器
-            if self.allocation_strategy == "round_robin":
+            # 优先使用调度提示，否则根据分配策略选择服务器
+            if preferred_server in available_servers:
+                selected_server = preferred_server
+            elif self.allocation_strategy == "round_robin":
                 selected_server = self._round_robin_allocation(available_servers)
             elif self.allocation_strategy == "least_loaded":
                 selected_server = self._least_loaded_allocation(available_servers)
@@ -460,26 +460,26 @@ class ResultManager:
         with self.lock:
             total_results = len(self.result_index)
             
-            # 按状态统计
+            # 一次遍历同时完成按状态、按日期统计和执行时间收集，每个结果只读取一次状态
             status_counts = {}
+            date_counts = {}
+            durations = []
             for result in self.result_index.values():
                 status = result.status.value
                 status_counts[status] = status_counts.get(status, 0) + 1
-            
-            # 按日期统计
-            date_counts = {}
-            for result in self.result_index.values():
+                
                 if result.start_time:
                     date = result.start_time.date().isoformat()
                     date_counts[date] = date_counts.get(date, 0) + 1
+                
+                if result.duration is not None:
+                    durations.append(result.duration)
             
             # 计算平均执行时间
-            durations = [r.duration for r in self.result_index.values() if r.duration is not None]
             avg_duration = sum(durations) / len(durations) if durations else 0
             
             # 计算成功率
-            successful = len([r for r in self.result_index.values() 
-                            if r.status == ExperimentStatus.COMPLETED])
+            successful = status_counts.get(ExperimentStatus.COMPLETED.value, 0)
             success_rate = (successful / total_results * 100) if total_results > 0 else 0
             
             return {
@@ -489,8 +489,7 @@ class ResultManager:
                 'average_duration': avg_duration,
                 'success_rate': success_rate,
                 'successful_count': successful,
-                'failed_count': len([r for r in self.result_index.values() 
-                                   if r.status == ExperimentStatus.FAILED])
+                'failed_count': status_counts.get(ExperimentStatus.FAILED.value, 0)
             }
     
     def compare_results(self, experiment_ids: List[str]) -> Dict[str, Any]:
@@ -108,7 +108,7 @@ class TaskManager:
             priority: 优先级（数字越大优先级越高）
             max_retries: 最大重试次数
             dependencies: 依赖的任务ID列表
-            callback: 任务完成回调函数
+            callback: 任务结束（完成或最终失败）回调函数
             
         Returns:
             任务ID
@@ -312,6 +312,13 @@ class TaskManager:
                 self.stats['total_failed'] += 1
                 
                 self.logger.error(f"❌ 任务失败: {task_id}, 错误: {error_message}")
+                
+                # 执行回调
+                if task.callback:
+                    try:
+                        task.callback(task)
+                    except Exception as e:
+                        self.logger.error(f"❌ 执行任务回调时出错: {e}")
             
             return True
     
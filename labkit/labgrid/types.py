@@ -67,6 +67,7 @@ class ExperimentConfig:
     dependencies: List[str] = field(default_factory=list) # 依赖的实验ID
     tags: List[str] = field(default_factory=list) # 标签
     description: Optional[str] = None # 实验描述
+    preferred_server: Optional[str] = None # 优先分配的服务器（调度提示，不可用时按分配策略选择）
 
 
 @dataclass